@@ -0,0 +1,119 @@
+"""
+Ruta optimizada de decodificación y codificación JSON para la API.
+
+`FastCodecRoute` es una subclase de `fastapi.routing.APIRoute` pensada para
+endpoints sencillos cuyo único parámetro es un modelo Pydantic en el cuerpo.
+En lugar de pasar por `request.json()` y la validación genérica de FastAPI,
+valida el cuerpo crudo con `model_validate_json` (parser y validador compilados
+de pydantic-core en un solo paso) y serializa la respuesta con
+`pydantic_core.to_json`, sin volver a validarla contra el `response_model`.
+
+La documentación OpenAPI no cambia, ya que se sigue generando a partir de la
+firma del endpoint. Los cuerpos vacíos, los que no son JSON y los que no
+superan la validación se delegan en el manejador estándar de `APIRoute`, de
+modo que los errores tienen exactamente el mismo formato; solo el camino
+correcto usa el decodificador compilado.
+"""
+
+import email.message
+import inspect
+from typing import Any, Callable, Coroutine, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
+from pydantic_core import to_json
+
+from .config import settings
+
+
+class FastJSONResponse(JSONResponse):
+    """Respuesta JSON serializada con el codificador en Rust de pydantic-core."""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def _body_model(endpoint: Callable[..., Any]) -> Optional[tuple[str, type[BaseModel]]]:
+    """
+    Obtiene el nombre y el modelo del único parámetro del endpoint.
+
+    Args:
+        endpoint: La función del endpoint.
+
+    Returns:
+        Una tupla `(nombre, modelo)` si el endpoint recibe exactamente un
+        parámetro anotado con un modelo Pydantic, o `None` en otro caso.
+    """
+    params = list(inspect.signature(endpoint).parameters.values())
+    if len(params) != 1:
+        return None
+    annotation = params[0].annotation
+    if inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+        return params[0].name, annotation
+    return None
+
+
+def _is_json(content_type: Optional[str]) -> bool:
+    """Indica si FastAPI trataría el cuerpo como JSON según su `Content-Type`."""
+    if not content_type:
+        return True
+    message = email.message.Message()
+    message["content-type"] = content_type
+    if message.get_content_maintype() != "application":
+        return False
+    subtype = message.get_content_subtype()
+    return subtype == "json" or subtype.endswith("+json")
+
+
+class FastCodecRoute(APIRoute):
+    """
+    Ruta de FastAPI con decodificación compilada y codificación rápida.
+
+    Solo se activa si `settings.app.FAST_CODEC` es verdadero, el endpoint es
+    asíncrono, no declara dependencias y recibe un único modelo Pydantic. En
+    cualquier otro caso se comporta exactamente como `APIRoute`. Las
+    solicitudes que no se pueden validar directamente como JSON (y las que
+    fallan la validación) se delegan en el manejador de `APIRoute`.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        body = _body_model(self.endpoint)
+        if (
+            not settings.app.FAST_CODEC
+            or body is None
+            or self.dependant.dependencies
+            or not inspect.iscoroutinefunction(self.endpoint)
+        ):
+            return super().get_route_handler()
+
+        param_name, model = body
+        endpoint = self.endpoint
+        status_code = self.status_code or 200
+        default_handler = super().get_route_handler()
+
+        async def handler(request: Request) -> Response:
+            if not _is_json(request.headers.get("content-type")):
+                return await default_handler(request)
+
+            # Starlette guarda el cuerpo ya leído, así que el manejador
+            # estándar puede volver a leerlo si hay que delegar
+            raw = await request.body()
+            if not raw:
+                return await default_handler(request)
+            try:
+                payload = model.model_validate_json(raw)
+            except ValidationError:
+                # El error lo genera el manejador estándar para que su formato
+                # (loc, msg, input) sea idéntico al de FastAPI
+                return await default_handler(request)
+
+            content = await endpoint(**{param_name: payload})
+            if isinstance(content, Response):
+                return content
+            # El contenido lo construye el propio endpoint, no hace falta
+            # validarlo de nuevo contra el response_model.
+            return FastJSONResponse(content, status_code=status_code)
+
+        return handler
@@ -27,6 +27,16 @@ class LiveKitSettings(BaseSettings):
     LIVEKIT_API_KEY: str
     LIVEKIT_API_SECRET: str
     LIVEKIT_URL: str  # Debería ser tu WS/WSS URL
+    # Nombre del agente para el despacho explícito. Si se define, el worker
+    # solo recibe los trabajos despachados a ese nombre (ver routers/rooms.py)
+    LIVEKIT_AGENT_NAME: str = ""
+    LIVEKIT_API_POOL_SIZE: int = 20  # Conexiones HTTP del cliente de la API de servidor
+    LIVEKIT_ROOM_EMPTY_TIMEOUT: int = 600  # Segundos que vive una sala vacía
+    LIVEKIT_TOKEN_TTL_SECONDS: int = 900  # Duración por defecto de los tokens
+    LIVEKIT_TOKEN_MAX_TTL_SECONDS: int = 3600  # Máximo que puede pedir un cliente
+    # Vida máxima de un token contando sus renovaciones, desde la emisión original
+    LIVEKIT_TOKEN_MAX_LIFETIME_SECONDS: int = 8 * 3600
+    LIVEKIT_TOKEN_REFRESH_CACHE_SIZE: int = 1024  # Tokens renovados recientemente
 
 
 class AzureSettings(BaseSettings):
@@ -69,6 +79,65 @@ class AgentSettings(BaseSettings):
 
     INSTRUCTIONS: str = "Eres un asistente de voz útil. Responde a las preguntas de los usuarios de forma concisa y clara."
 
+    # Segundos máximos para que la sesión arranque y se conecte a la sala
+    STARTUP_TIMEOUT: float = 15.0
+
+    # Audio de entrada hacia el STT (PCM de 16 bits)
+    AUDIO_SAMPLE_RATE: int = 16000
+    AUDIO_NUM_CHANNELS: int = 1
+    AUDIO_BUFFER_MS: int = 2000  # Capacidad del buffer circular por sesión
+    AUDIO_CHUNK_MS: int = 50  # Tamaño de cada fragmento enviado al STT
+    AUDIO_BUFFER_POLICY: str = "drop_oldest"  # "drop_oldest" o "block"
+    AUDIO_BUFFER_BLOCK_TIMEOUT: float = 0.2  # Segundos de espera con "block"
+
+    # Troceado adaptativo del texto enviado al TTS
+    TTS_FIRST_CHUNK_CHARS: int = 40  # Primer fragmento de cada respuesta
+    TTS_MIN_CHUNK_CHARS: int = 20
+    TTS_MAX_CHUNK_CHARS: int = 400
+    TTS_TARGET_OVERHEAD: float = 0.2  # Fracción máxima de latencia fija por petición
+
+    # Directorio donde grabar las sesiones para reproducirlas (vacío lo desactiva)
+    RECORD_SESSIONS_DIR: str = ""
+
+    # Muletillas pre-sintetizadas que enmascaran la latencia del primer fragmento del LLM
+    FILLER_ENABLED: bool = True
+    FILLER_DEADLINE: float = 0.8  # Segundos de espera antes de reproducir una muletilla
+    # Caché en disco de las muletillas sintetizadas, por voz (vacío la desactiva)
+    FILLER_CACHE_DIR: str = os.path.join(ROOT_DIR, "cache", "fillers")
+    FILLER_PHRASES: list[str] = [
+        "Mmm...",
+        "A ver...",
+        "Vale, un momento...",
+        "Déjame pensar...",
+        "Bueno...",
+    ]
+
+
+class DiagnosticsSettings(BaseSettings):
+    """Configuración del diagnóstico de recursos del worker del agente."""
+
+    # Variables de entorno con prefijo, ej. DIAGNOSTICS_ENABLED
+    model_config = SettingsConfigDict(env_prefix="DIAGNOSTICS_", extra="ignore")
+
+    ENABLED: bool = True
+    LEAK_THRESHOLD_BYTES: int = 50 * 1024 * 1024
+    TRACEMALLOC_TOP: int = 0  # 0 desactiva tracemalloc (tiene coste en CPU)
+    # Límites de memoria por trabajo que vigila el proceso principal del worker
+    JOB_MEMORY_WARN_MB: float = 500
+    JOB_MEMORY_LIMIT_MB: float = 0  # 0 desactiva el cierre del trabajo por memoria
+    DUMP_DIR: str = os.path.join(ROOT_DIR, "diagnostics")
+
+
+class UsageSettings(BaseSettings):
+    """Configuración de la contabilidad de uso por sala del worker del agente."""
+
+    # Variables de entorno con prefijo, ej. USAGE_FLUSH_INTERVAL
+    model_config = SettingsConfigDict(env_prefix="USAGE_", extra="ignore")
+
+    ENABLED: bool = True
+    FLUSH_INTERVAL: float = 30.0  # Segundos entre volcados (0 solo al terminar)
+    FILE: str = os.path.join(ROOT_DIR, "usage", "usage.jsonl")
+
 
 class Contact(BaseSettings):
     """Define los datos de contacto para la documentación de la API."""
@@ -88,6 +157,8 @@ class AppSettings(BaseSettings):
     )
     APP_DOCS_URL: str = "/"
     APP_REDOC_URL: str = "/redoc"
+    # Usa la ruta optimizada de decodificación/codificación JSON (core.codec)
+    FAST_CODEC: bool = True
 
     @property
     def api_prefix(self):  # pragma: no cover
@@ -109,10 +180,16 @@ class Settings(BaseSettings):
     )
 
     LOG_LEVEL: str
+    LOG_JSON: bool = True  # Salida de logs en JSON estructurado
+    LOG_QUEUE_SIZE: int = 10000  # Registros pendientes antes de descartar
+    LOG_RATE_LIMIT: float = 5.0  # Registros/segundo por plantilla (0 sin límite)
+    LOG_RATE_BURST: int = 20
     livekit: LiveKitSettings = LiveKitSettings()
     azure: AzureSettings = AzureSettings()
     elevenlabs: ElevenLabsSettings = ElevenLabsSettings()
     agent: AgentSettings = AgentSettings()
+    diagnostics: DiagnosticsSettings = DiagnosticsSettings()
+    usage: UsageSettings = UsageSettings()
     app: AppSettings = AppSettings()
 
 
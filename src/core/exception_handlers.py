@@ -10,7 +10,12 @@ from fastapi import FastAPI, Request, status
 from fastapi.exceptions import HTTPException
 from fastapi.responses import JSONResponse
 
-from .exceptions import AgentError, LiveKitTokenError
+from .exceptions import (
+    AgentError,
+    LiveKitRoomError,
+    LiveKitTokenError,
+    LiveKitTokenRefreshError,
+)
 
 
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -46,6 +51,42 @@ async def livekit_token_error_handler(request: Request, exc: LiveKitTokenError):
     )
 
 
+async def livekit_token_refresh_error_handler(
+    request: Request, exc: LiveKitTokenRefreshError
+):
+    """
+    Manejador para la excepción personalizada LiveKitTokenRefreshError.
+
+    Args:
+        request: El objeto de la solicitud entrante.
+        exc: La instancia de la excepción LiveKitTokenRefreshError.
+
+    Returns:
+        Una respuesta JSON con el código de estado y el mensaje de la excepción.
+    """
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.message},
+    )
+
+
+async def livekit_room_error_handler(request: Request, exc: LiveKitRoomError):
+    """
+    Manejador para la excepción personalizada LiveKitRoomError.
+
+    Args:
+        request: El objeto de la solicitud entrante.
+        exc: La instancia de la excepción LiveKitRoomError.
+
+    Returns:
+        Una respuesta JSON con el código de estado y el mensaje de la excepción.
+    """
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.message},
+    )
+
+
 async def agent_error_handler(request: Request, exc: AgentError):
     """
     Manejador para la excepción personalizada AgentError.
@@ -92,6 +133,10 @@ def add_exception_handlers(app: FastAPI):
     """
     app.add_exception_handler(HTTPException, http_exception_handler)
     app.add_exception_handler(LiveKitTokenError, livekit_token_error_handler)
+    app.add_exception_handler(
+        LiveKitTokenRefreshError, livekit_token_refresh_error_handler
+    )
+    app.add_exception_handler(LiveKitRoomError, livekit_room_error_handler)
     app.add_exception_handler(AgentError, agent_error_handler)
     # El manejador genérico debe ir al final como un "catch-all"
     app.add_exception_handler(Exception, generic_exception_handler)
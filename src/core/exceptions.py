@@ -18,6 +18,15 @@ class LiveKitTokenError(Exception):
         super().__init__(self.message)
 
 
+class LiveKitTokenRefreshError(Exception):
+    """Se lanza cuando el token a renovar no es válido o ha caducado."""
+
+    def __init__(self, message: str = "El token de LiveKit no es válido"):
+        self.status_code = status.HTTP_401_UNAUTHORIZED
+        self.message = message
+        super().__init__(self.message)
+
+
 class AgentError(Exception):
     """Se lanza cuando ocurre un error relacionado con el agente de LiveKit."""
 
@@ -25,3 +34,12 @@ class AgentError(Exception):
         self.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
         self.message = message
         super().__init__(self.message)
+
+
+class LiveKitRoomError(Exception):
+    """Se lanza cuando falla la creación de una sala o el despacho de un agente."""
+
+    def __init__(self, message: str = "No se pudo crear la sala de LiveKit"):
+        self.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        self.message = message
+        super().__init__(self.message)
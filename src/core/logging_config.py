@@ -0,0 +1,251 @@
+"""
+Configuración de logging no bloqueante.
+
+Los registros se encolan desde el bucle de eventos mediante un `QueueHandler`
+y se formatean y escriben en un hilo aparte (`QueueListener`), de modo que un
+destino lento (stdout atascado por un recolector de logs) nunca detiene el
+pipeline de audio. Además:
+
+- El mensaje se formatea de forma perezosa en el hilo del listener.
+- La salida puede ser JSON estructurado, una línea por registro.
+- Los campos de contexto de la sesión (sala, trabajo...) se añaden a cada
+  registro mediante `bind_session`.
+- Los mensajes repetitivos se limitan por plantilla con un token bucket.
+
+Con livekit-agents hay dos tipos de proceso. El proceso principal del worker
+usa `configure_logging`, que sustituye el handler síncrono de stdout que añade
+el CLI de livekit. Cada trabajo se ejecuta en un proceso hijo cuyo logger raíz
+ya reenvía los registros al principal a través de una cola (`LogQueueHandler`
+de livekit); ahí solo se añaden los filtros con `configure_job_logging`, para
+que los registros se escriban una única vez desde el proceso principal.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar, Token
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+_session_context: ContextVar[dict[str, Any]] = ContextVar("session_context", default={})
+
+_listener: Optional[QueueListener] = None
+
+# Atributos estándar de LogRecord que no se copian como campos extra
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "session"}
+
+
+def bind_session(**fields: Any) -> Token:
+    """
+    Añade campos de contexto de la sesión a los logs de la tarea actual.
+
+    Args:
+        **fields: Campos a añadir (ej. `room="sala-1"`).
+
+    Returns:
+        Token: Token para restaurar el contexto anterior con `unbind_session`.
+    """
+    return _session_context.set({**_session_context.get(), **fields})
+
+
+def unbind_session(token: Token):
+    """Restaura el contexto de sesión anterior a `bind_session`."""
+    _session_context.reset(token)
+
+
+class SessionContextFilter(logging.Filter):
+    """
+    Copia el contexto de sesión al registro en el hilo que lo emite.
+
+    Los registros que llegan de un proceso de trabajo ya traen su contexto y
+    no se sobrescriben.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "session"):
+            record.session = _session_context.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita los registros repetidos por logger y plantilla de mensaje.
+
+    Cada plantilla tiene un token bucket de `burst` registros que se recarga a
+    `rate` registros por segundo. El número de registros suprimidos se añade
+    como campo `suppressed` al siguiente registro que se deja pasar.
+
+    Args:
+        rate: Registros por segundo permitidos por plantilla (0 lo desactiva).
+        burst: Ráfaga máxima de registros por plantilla.
+        max_keys: Número máximo de plantillas distintas en memoria.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 1024):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: dict[tuple[str, Any], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.rate or record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.clear()
+                # [tokens, último instante, suprimidos]
+                bucket = self._buckets[key] = [self.burst, now, 0]
+
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+
+            bucket[0] = tokens - 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    `QueueHandler` que nunca bloquea ni formatea en el hilo que emite.
+
+    Si la cola está llena, el registro se descarta y se contabiliza en
+    `dropped` en lugar de esperar al listener.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # El formateo se hace en el hilo del listener
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como un objeto JSON en una sola línea."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **getattr(record, "session", {}),
+        }
+        data.update(
+            (key, value) for key, value in vars(record).items() if key not in _RESERVED
+        )
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato de texto legible que incluye el contexto de la sesión."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        session = getattr(record, "session", {})
+        if session:
+            line += " " + " ".join(f"{k}={v}" for k, v in session.items())
+        return line
+
+
+def configure_logging(
+    level: str,
+    json_output: bool = True,
+    queue_size: int = 10000,
+    rate_limit: float = 0,
+    rate_burst: int = 10,
+) -> QueueListener:
+    """
+    Configura el logger raíz con una cola y un hilo de escritura.
+
+    Sustituye los handlers existentes del logger raíz. Se puede llamar varias
+    veces: el listener anterior se detiene antes de crear el nuevo.
+
+    Args:
+        level: Nivel de log (ej. "INFO").
+        json_output: Si es `True`, escribe JSON estructurado; si no, texto.
+        queue_size: Tamaño máximo de la cola de registros pendientes.
+        rate_limit: Registros por segundo permitidos por plantilla (0 sin límite).
+        rate_burst: Ráfaga máxima por plantilla.
+
+    Returns:
+        QueueListener: El listener en ejecución.
+    """
+    global _listener
+    shutdown_logging()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        JsonFormatter()
+        if json_output
+        else TextFormatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    queue_handler.addFilter(RateLimitFilter(rate_limit, rate_burst))
+    queue_handler.addFilter(SessionContextFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(queue_handler.queue, stream_handler)
+    _listener.start()
+    return _listener
+
+
+def configure_job_logging(rate_limit: float = 0, rate_burst: int = 10):
+    """
+    Añade el contexto de sesión y la limitación a los logs de un proceso de trabajo.
+
+    No añade ningún destino: los handlers que ya tiene el logger raíz (el
+    `LogQueueHandler` de livekit, que reenvía sin bloquear al proceso
+    principal) reciben los filtros, de modo que el contexto de sesión viaja
+    con cada registro.
+
+    Args:
+        rate_limit: Registros por segundo permitidos por plantilla (0 sin límite).
+        rate_burst: Ráfaga máxima por plantilla.
+    """
+    rate_filter = RateLimitFilter(rate_limit, rate_burst)
+    context_filter = SessionContextFilter()
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(rate_filter)
+        handler.addFilter(context_filter)
+
+
+@atexit.register
+def shutdown_logging():
+    """Vacía la cola pendiente y detiene el hilo del listener (si está activo)."""
+    global _listener
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+    _listener = None
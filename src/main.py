@@ -9,11 +9,13 @@ También define un endpoint de health check.
 import asyncio
 from contextlib import asynccontextmanager
 
+import aiohttp
 from fastapi import FastAPI
+from livekit.api import LiveKitAPI
 
 from .core.config import settings
 from .core.exception_handlers import add_exception_handlers
-from .routers import token
+from .routers import rooms, token
 
 
 @asynccontextmanager
@@ -21,17 +23,30 @@ async def lifespan(app: FastAPI):
     """
     Gestiona el ciclo de vida de la aplicación FastAPI.
 
-    Actualmente, silencia las excepciones de cancelación e interrupción
-    para permitir un apagado más limpio de la aplicación.
+    Crea un único cliente de la API de servidor de LiveKit, con un pool de
+    conexiones HTTP compartido, que usan todas las rutas a través de
+    `app.state.livekit_api`. Además, silencia las excepciones de cancelación e
+    interrupción para permitir un apagado más limpio de la aplicación.
 
     Args:
         app: La instancia de la aplicación FastAPI.
     """
-    try:  # pragma: no cover
-        yield
-    except (asyncio.CancelledError, KeyboardInterrupt):  # pragma: no cover
-        # ? Silenciar excepciones de cancelación/interrupción
-        pass
+    # Pool de conexiones HTTP compartido por todas las llamadas a la API de servidor
+    connector = aiohttp.TCPConnector(limit=settings.livekit.LIVEKIT_API_POOL_SIZE)
+    async with aiohttp.ClientSession(connector=connector) as http:  # pragma: no cover
+        app.state.livekit_api = LiveKitAPI(
+            url=settings.livekit.LIVEKIT_URL,
+            api_key=settings.livekit.LIVEKIT_API_KEY,
+            api_secret=settings.livekit.LIVEKIT_API_SECRET,
+            session=http,
+        )
+        try:
+            yield
+        except (asyncio.CancelledError, KeyboardInterrupt):
+            # ? Silenciar excepciones de cancelación/interrupción
+            pass
+        finally:
+            await app.state.livekit_api.aclose()
 
 
 app = FastAPI(
@@ -49,6 +64,7 @@ app = FastAPI(
 add_exception_handlers(app)
 
 app.include_router(token.router, prefix=settings.app.api_prefix)
+app.include_router(rooms.router, prefix=settings.app.api_prefix)
 
 
 @app.get(f"{settings.app.api_prefix}/healthcheck", tags=["Monitoring"])
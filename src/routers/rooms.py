@@ -0,0 +1,210 @@
+"""
+Define las rutas de la API para aprovisionar salas de LiveKit por adelantado.
+
+Permite crear salas (una a una o en bloque) antes de una sesión programada y
+despachar explícitamente un agente a ellas, de modo que el agente ya esté en
+la sala cuando llegue el primer usuario. Todas las rutas usan el cliente de la
+API de servidor de LiveKit compartido que se crea en el `lifespan` de la
+aplicación.
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request
+from livekit.api import CreateAgentDispatchRequest, CreateRoomRequest, LiveKitAPI
+
+from src.core.config import settings
+from src.core.exceptions import LiveKitRoomError
+from src.schemas.rooms import (
+    AgentDispatchRequest,
+    AgentDispatchResponse,
+    BulkRoomCreateRequest,
+    RoomCreateRequest,
+    RoomResponse,
+)
+
+router = APIRouter(
+    prefix="/livekit/rooms",
+    tags=["LiveKit"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+def get_livekit_api(request: Request) -> LiveKitAPI:
+    """
+    Dependencia que devuelve el cliente compartido de la API de servidor de LiveKit.
+
+    Args:
+        request: La solicitud entrante.
+
+    Returns:
+        LiveKitAPI: El cliente creado en el `lifespan` de la aplicación.
+    """
+    return request.app.state.livekit_api
+
+
+def _require_agent_name():
+    """Comprueba que haya un nombre de agente para el despacho explícito."""
+    if not settings.livekit.LIVEKIT_AGENT_NAME:
+        raise LiveKitRoomError(
+            "Explicit agent dispatch requires LIVEKIT_AGENT_NAME to be set"
+        )
+
+
+async def _existing_dispatch(
+    api: LiveKitAPI, room: str
+) -> Optional[AgentDispatchResponse]:
+    """Devuelve el despacho del agente configurado en una sala, si ya existe."""
+    try:
+        dispatches = await api.agent_dispatch.list_dispatch(room)
+    except Exception as e:
+        raise LiveKitRoomError(
+            f"Could not list agent dispatches in room '{room}': {e}"
+        ) from e
+    for dispatch in dispatches:
+        if dispatch.agent_name == settings.livekit.LIVEKIT_AGENT_NAME:
+            return AgentDispatchResponse(
+                dispatch_id=dispatch.id,
+                agent_name=dispatch.agent_name,
+                room=dispatch.room,
+            )
+    return None
+
+
+async def _dispatch_agent(
+    api: LiveKitAPI, room: str, metadata: Optional[str]
+) -> AgentDispatchResponse:
+    """Despacha el agente configurado a una sala."""
+    _require_agent_name()
+
+    try:
+        dispatch = await api.agent_dispatch.create_dispatch(
+            CreateAgentDispatchRequest(
+                agent_name=settings.livekit.LIVEKIT_AGENT_NAME,
+                room=room,
+                metadata=metadata or "",
+            )
+        )
+    except Exception as e:
+        raise LiveKitRoomError(f"Could not dispatch agent to room '{room}': {e}") from e
+    return AgentDispatchResponse(
+        dispatch_id=dispatch.id, agent_name=dispatch.agent_name, room=dispatch.room
+    )
+
+
+async def _create_room(api: LiveKitAPI, request: RoomCreateRequest) -> RoomResponse:
+    """
+    Crea una sala y, si se solicita, despacha el agente a ella.
+
+    Si la sala ya tenía un despacho del agente configurado (por ejemplo, al
+    reintentar una solicitud), se reutiliza en lugar de crear otro.
+    """
+    dispatch_agent = request.dispatch_agent
+    if dispatch_agent is None:
+        dispatch_agent = bool(settings.livekit.LIVEKIT_AGENT_NAME)
+    if dispatch_agent:
+        # Se comprueba antes de crear la sala para no dejarla a medias
+        _require_agent_name()
+
+    try:
+        room = await api.room.create_room(
+            CreateRoomRequest(
+                name=request.name,
+                empty_timeout=request.empty_timeout
+                or settings.livekit.LIVEKIT_ROOM_EMPTY_TIMEOUT,
+                max_participants=request.max_participants or 0,
+                metadata=request.metadata or "",
+            )
+        )
+    except Exception as e:
+        raise LiveKitRoomError(f"Could not create room '{request.name}': {e}") from e
+
+    dispatch = None
+    if dispatch_agent:
+        dispatch = await _existing_dispatch(api, room.name)
+        if dispatch is None:
+            dispatch = await _dispatch_agent(api, room.name, request.agent_metadata)
+
+    return RoomResponse(
+        name=room.name,
+        sid=room.sid,
+        empty_timeout=room.empty_timeout,
+        max_participants=room.max_participants,
+        creation_time=room.creation_time,
+        metadata=room.metadata,
+        dispatch=dispatch,
+    )
+
+
+@router.post("", response_model=RoomResponse)
+async def create_room(
+    request: RoomCreateRequest, api: LiveKitAPI = Depends(get_livekit_api)
+):
+    """
+    Crea una sala de LiveKit por adelantado y, opcionalmente, despacha un agente.
+
+    Args:
+        request: Un objeto `RoomCreateRequest` con los datos de la sala.
+        api: El cliente compartido de la API de servidor de LiveKit.
+
+    Returns:
+        La sala creada y el despacho del agente, si se solicitó.
+
+    Raises:
+        LiveKitRoomError: Si falla la creación de la sala o el despacho.
+    """
+    return await _create_room(api, request)
+
+
+@router.post("/bulk", response_model=list[RoomResponse])
+async def create_rooms(
+    request: BulkRoomCreateRequest, api: LiveKitAPI = Depends(get_livekit_api)
+):
+    """
+    Crea varias salas en paralelo, limitado por el tamaño del pool de conexiones.
+
+    Crear una sala que ya existe devuelve la sala existente y las salas que ya
+    tienen el agente despachado no se vuelven a despachar, por lo que la
+    solicitud se puede reintentar si falla a medias.
+
+    Args:
+        request: Un objeto `BulkRoomCreateRequest` con las salas a crear.
+        api: El cliente compartido de la API de servidor de LiveKit.
+
+    Returns:
+        La lista de salas creadas, en el mismo orden que la solicitud.
+
+    Raises:
+        LiveKitRoomError: Si falla la creación de alguna sala o su despacho.
+    """
+    semaphore = asyncio.Semaphore(settings.livekit.LIVEKIT_API_POOL_SIZE)
+
+    async def create(room: RoomCreateRequest) -> RoomResponse:
+        async with semaphore:
+            return await _create_room(api, room)
+
+    return await asyncio.gather(*(create(room) for room in request.rooms))
+
+
+@router.post("/{room_name}/dispatch", response_model=AgentDispatchResponse)
+async def dispatch_agent(
+    room_name: str,
+    request: AgentDispatchRequest,
+    api: LiveKitAPI = Depends(get_livekit_api),
+):
+    """
+    Despacha explícitamente el agente a una sala existente.
+
+    Args:
+        room_name: El nombre de la sala.
+        request: Un objeto `AgentDispatchRequest` con los metadatos del agente.
+        api: El cliente compartido de la API de servidor de LiveKit.
+
+    Returns:
+        Los datos del despacho creado.
+
+    Raises:
+        LiveKitRoomError: Si falla el despacho.
+    """
+    return await _dispatch_agent(api, room_name, request.metadata)
@@ -1,24 +1,84 @@
 """
 Define las rutas de la API para las operaciones relacionadas con LiveKit.
 
-Actualmente, contiene la ruta para generar tokens de acceso para que los
-clientes se conecten a las salas de LiveKit.
+Contiene la ruta para generar tokens de acceso de corta duración para que los
+clientes se conecten a las salas de LiveKit, y la ruta para renovarlos a partir
+de un token todavía válido sin repetir la solicitud completa.
 """
 
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional
+
+import jwt
 from fastapi import APIRouter
 from livekit.api import AccessToken, VideoGrants
+from livekit.api.access_token import DEFAULT_LEEWAY
 
+from src.core.codec import FastCodecRoute
 from src.core.config import settings
-from src.core.exceptions import LiveKitTokenError
-from src.schemas.token import TokenRequest
+from src.core.exceptions import LiveKitTokenError, LiveKitTokenRefreshError
+from src.schemas.token import TokenRefreshRequest, TokenRequest
 
 router = APIRouter(
     prefix="/livekit",
     tags=["LiveKit"],
     responses={404: {"description": "Not found"}},
+    route_class=FastCodecRoute,
 )
 
 
+class RefreshCache:
+    """
+    Caché LRU de tokens renovados recientemente.
+
+    Guarda, por token original y duración solicitada, el token emitido y las
+    fechas de caducidad de ambos. Si un cliente reintenta la misma renovación,
+    se devuelve el token ya emitido sin verificar ni firmar de nuevo.
+
+    Args:
+        max_size: Número máximo de entradas.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: OrderedDict[str, tuple[str, float, float]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        """Devuelve el token renovado si el original y el nuevo siguen vigentes."""
+        item = self._items.get(key)
+        if item is None:
+            return None
+
+        new_token, new_expires, old_expires = item
+        if time.time() >= min(new_expires, old_expires):
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return new_token
+
+    def put(self, key: str, new_token: str, new_expires: float, old_expires: float):
+        """Guarda un token renovado, descartando los más antiguos si se llena."""
+        self._items[key] = (new_token, new_expires, old_expires)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+
+refresh_cache = RefreshCache(settings.livekit.LIVEKIT_TOKEN_REFRESH_CACHE_SIZE)
+
+
+def _token_ttl(requested: Optional[int]) -> timedelta:
+    """Duración del token solicitada, limitada al máximo configurado."""
+    ttl = requested or settings.livekit.LIVEKIT_TOKEN_TTL_SECONDS
+    return timedelta(seconds=min(ttl, settings.livekit.LIVEKIT_TOKEN_MAX_TTL_SECONDS))
+
+
 @router.post("/token", response_model=dict[str, str])
 async def token(request: TokenRequest):
     """
@@ -45,7 +105,74 @@ async def token(request: TokenRequest):
             .with_name(request.name)
             .with_metadata(request.metadata)
             .with_grants(VideoGrants(room=request.room_name, room_join=True))
+            .with_ttl(_token_ttl(request.ttl_seconds))
         )
         return {"access_token": token.to_jwt()}
     except Exception as e:
         raise LiveKitTokenError(f"Could not generate LiveKit token: {e}") from e
+
+
+@router.post("/token/refresh", response_model=dict[str, str])
+async def refresh_token(request: TokenRefreshRequest):
+    """
+    Renueva un token de acceso de LiveKit que todavía es válido.
+
+    Verifica la firma, el emisor y la caducidad del token actual y emite uno
+    nuevo con los mismos claims (identidad, metadatos, atributos y todos los
+    permisos); solo cambian `nbf` y `exp`. El instante de la emisión original
+    se conserva en `auth_time`, y no se renueva un token más allá de
+    `LIVEKIT_TOKEN_MAX_LIFETIME_SECONDS` desde ese instante. Las renovaciones
+    repetidas del mismo token con la misma duración devuelven el token ya emitido.
+
+    Args:
+        request: Un objeto `TokenRefreshRequest` con el token actual.
+
+    Returns:
+        Un diccionario que contiene el nuevo `access_token` JWT.
+
+    Raises:
+        LiveKitTokenRefreshError: Si el token no es válido, ha caducado, no
+            lo emitió este servidor o ha superado su vida máxima.
+        LiveKitTokenError: Si ocurre un error durante la generación del nuevo token.
+    """
+    ttl = int(_token_ttl(request.ttl_seconds).total_seconds())
+    digest = hashlib.sha256(request.access_token.encode()).hexdigest()
+    cache_key = f"{digest}:{ttl}"
+    cached = refresh_cache.get(cache_key)
+    if cached is not None:
+        return {"access_token": cached}
+
+    api_key = settings.livekit.LIVEKIT_API_KEY
+    api_secret = settings.livekit.LIVEKIT_API_SECRET
+    try:
+        claims = jwt.decode(
+            request.access_token,
+            key=api_secret,
+            issuer=api_key,
+            algorithms=["HS256"],
+            leeway=DEFAULT_LEEWAY,
+        )
+    except Exception as e:
+        raise LiveKitTokenRefreshError(f"Invalid or expired LiveKit token: {e}") from e
+
+    # Los tokens de `/token` no llevan `auth_time`: su emisión es su `nbf`
+    auth_time = claims.get("auth_time", claims.get("nbf"))
+    if not isinstance(auth_time, int):
+        raise LiveKitTokenRefreshError("LiveKit token has no issue time")
+    max_expires = auth_time + settings.livekit.LIVEKIT_TOKEN_MAX_LIFETIME_SECONDS
+    now = int(time.time())
+    if now >= max_expires:
+        raise LiveKitTokenRefreshError("LiveKit token exceeded its maximum lifetime")
+
+    expires = min(now + ttl, max_expires)
+    try:
+        new_token = jwt.encode(
+            {**claims, "auth_time": auth_time, "nbf": now, "exp": expires},
+            api_secret,
+            algorithm="HS256",
+        )
+    except Exception as e:
+        raise LiveKitTokenError(f"Could not generate LiveKit token: {e}") from e
+
+    refresh_cache.put(cache_key, new_token, expires, claims["exp"])
+    return {"access_token": new_token}
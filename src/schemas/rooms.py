@@ -0,0 +1,107 @@
+"""
+Define los schemas de Pydantic para la creación de salas y el despacho de agentes.
+
+Estos modelos permiten aprovisionar salas de LiveKit por adelantado (antes de
+que lleguen los usuarios) y despachar explícitamente un agente a ellas.
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class RoomCreateRequest(BaseModel):
+    """
+    Schema para la solicitud de creación de una sala de LiveKit.
+
+    Atributos:
+        name (str): El nombre de la sala.
+        empty_timeout (Optional[int]): Segundos que la sala permanece abierta sin participantes.
+        max_participants (Optional[int]): Número máximo de participantes (0 sin límite).
+        metadata (Optional[str]): Metadatos personalizados de la sala.
+        dispatch_agent (Optional[bool]): Si es `True`, despacha un agente a la sala
+            tras crearla. Por defecto, solo si hay un `LIVEKIT_AGENT_NAME` configurado.
+        agent_metadata (Optional[str]): Metadatos que se envían al agente despachado.
+    """
+
+    name: str
+    empty_timeout: Optional[int] = None
+    max_participants: Optional[int] = None
+    metadata: Optional[str] = None
+    dispatch_agent: Optional[bool] = None
+    agent_metadata: Optional[str] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "name": "consulta-2024-05-01-1000",
+                    "empty_timeout": 600,
+                    "max_participants": 2,
+                    "metadata": '{"cita_id": 42}',
+                    "dispatch_agent": True,
+                    "agent_metadata": '{"idioma": "es"}',
+                }
+            ]
+        }
+    }
+
+
+class BulkRoomCreateRequest(BaseModel):
+    """
+    Schema para crear varias salas en una sola solicitud.
+
+    Atributos:
+        rooms (list[RoomCreateRequest]): Las salas a crear.
+    """
+
+    rooms: list[RoomCreateRequest] = Field(min_length=1, max_length=100)
+
+
+class AgentDispatchRequest(BaseModel):
+    """
+    Schema para despachar un agente a una sala existente.
+
+    Atributos:
+        metadata (Optional[str]): Metadatos que se envían al agente despachado.
+    """
+
+    metadata: Optional[str] = None
+
+
+class AgentDispatchResponse(BaseModel):
+    """
+    Schema de respuesta de un despacho de agente.
+
+    Atributos:
+        dispatch_id (str): Identificador del despacho en LiveKit.
+        agent_name (str): Nombre del agente despachado.
+        room (str): Sala a la que se despachó el agente.
+    """
+
+    dispatch_id: str
+    agent_name: str
+    room: str
+
+
+class RoomResponse(BaseModel):
+    """
+    Schema de respuesta de una sala creada.
+
+    Atributos:
+        name (str): El nombre de la sala.
+        sid (str): El identificador de la sala en LiveKit.
+        empty_timeout (int): Segundos que la sala permanece abierta sin participantes.
+        max_participants (int): Número máximo de participantes.
+        creation_time (int): Instante de creación (segundos desde epoch).
+        metadata (str): Metadatos de la sala.
+        dispatch (Optional[AgentDispatchResponse]): El despacho del agente, si se solicitó.
+    """
+
+    name: str
+    sid: str
+    empty_timeout: int
+    max_participants: int
+    creation_time: int
+    metadata: str
+    dispatch: Optional[AgentDispatchResponse] = None
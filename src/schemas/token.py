@@ -7,7 +7,7 @@ automáticamente los cuerpos de las solicitudes (request bodies) en la API.
 
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class TokenRequest(BaseModel):
@@ -19,12 +19,15 @@ class TokenRequest(BaseModel):
         identity (str): La identidad única del participante.
         name (Optional[str]): El nombre visible del participante en la sala.
         metadata (Optional[str]): Metadatos personalizados para asociar al participante.
+        ttl_seconds (Optional[int]): Duración del token en segundos. Se limita al
+            máximo configurado; si se omite, se usa la duración por defecto.
     """
 
     room_name: str
     identity: str
     name: Optional[str] = None
     metadata: Optional[str] = None
+    ttl_seconds: Optional[int] = Field(default=None, gt=0)
 
     model_config = {
         "json_schema_extra": {
@@ -34,7 +37,22 @@ class TokenRequest(BaseModel):
                     "identity": "identidad-unica-del-usuario",
                     "name": "Nombre del Usuario",
                     "metadata": '{"user_id": 123, "rol": "moderador"}',
+                    "ttl_seconds": 900,
                 }
             ]
         }
     }
+
+
+class TokenRefreshRequest(BaseModel):
+    """
+    Schema para la solicitud de renovación de un token de acceso de LiveKit.
+
+    Atributos:
+        access_token (str): El token actual, que debe seguir siendo válido.
+        ttl_seconds (Optional[int]): Duración del nuevo token en segundos. Se
+            limita al máximo configurado; si se omite, se usa la duración por defecto.
+    """
+
+    access_token: str
+    ttl_seconds: Optional[int] = Field(default=None, gt=0)
@@ -5,13 +5,23 @@ Este módulo contiene la clase `MyAgent`, que hereda de `livekit.agents.Agent`
 y orquesta el flujo de procesamiento de audio: STT -> LLM -> TTS.
 """
 
+import asyncio
 import logging
+import time
+from typing import Optional
 
+from livekit import rtc
 from livekit.agents import Agent, AgentSession
 from livekit.agents.worker import JobContext
 
 from src.core.config import settings
+from src.core.logging_config import bind_session
 from src.services.agent_config import llm, stt, tts
+from src.services.audio_buffer import PCMRingBuffer
+from src.services.fillers import LatencyMasker, load_filler_pool
+from src.services.replay import SessionRecorder, recording_path
+from src.services.tts_chunking import AdaptiveChunker
+from src.services.usage import Metric, RoomUsage
 
 logger = logging.getLogger("agent")
 
@@ -22,28 +32,153 @@ class MyAgent(Agent):
     y la sintetiza de nuevo a voz.
     """
 
-    def __init__(self):
-        """Inicializa el agente con las instrucciones del sistema para el LLM."""
+    def __init__(self, usage: Optional[RoomUsage] = None):
+        """
+        Inicializa el agente con las instrucciones del sistema para el LLM, el
+        buffer circular de audio que alimenta al STT, el troceado adaptativo
+        del texto que se envía al TTS y las muletillas que enmascaran la
+        latencia del LLM.
+
+        Args:
+            usage: Contadores de uso de la sala, normalmente registrados en el
+                `UsageAccounting` del worker. Si no se indican, se crean unos
+                propios.
+        """
         super().__init__(instructions=settings.agent.INSTRUCTIONS)
 
+        config = settings.agent
+        bytes_per_ms = config.AUDIO_SAMPLE_RATE * config.AUDIO_NUM_CHANNELS * 2 // 1000
+        self._chunk_bytes = config.AUDIO_CHUNK_MS * bytes_per_ms
+        self.audio_buffer = PCMRingBuffer(
+            capacity_bytes=config.AUDIO_BUFFER_MS * bytes_per_ms,
+            max_read_bytes=self._chunk_bytes,
+            policy=config.AUDIO_BUFFER_POLICY,
+            block_timeout=config.AUDIO_BUFFER_BLOCK_TIMEOUT,
+            align=config.AUDIO_NUM_CHANNELS * 2,
+        )
+        self._audio_tasks: set[asyncio.Task] = set()
+        # Solo se escucha a un participante: el primero que publica audio
+        self._linked_identity: Optional[str] = None
+        self._track_task: Optional[asyncio.Task] = None
+        self.tts_chunker = AdaptiveChunker(
+            first_chunk_chars=config.TTS_FIRST_CHUNK_CHARS,
+            min_chunk_chars=config.TTS_MIN_CHUNK_CHARS,
+            max_chunk_chars=config.TTS_MAX_CHUNK_CHARS,
+            target_overhead=config.TTS_TARGET_OVERHEAD,
+        )
+        self.recorder: Optional[SessionRecorder] = None
+        self.latency_masker = LatencyMasker(deadline=config.FILLER_DEADLINE)
+        self.usage = usage if usage is not None else RoomUsage()
+
+    async def _buffer_audio(self, audio_stream):
+        """
+        Copia las tramas de audio de una pista al buffer circular.
+
+        El buffer no se cierra al terminar la pista, ya que el participante
+        puede volver a publicar audio; se cierra al terminar la sesión.
+
+        Args:
+            audio_stream: Un iterable asíncrono de eventos con una trama
+                (`rtc.AudioStream`).
+        """
+        async for event in audio_stream:
+            await self.audio_buffer.write(event.frame.data)
+
+    async def _feed_stt(self, stt_stream):
+        """
+        Envía el audio del buffer circular al stream del STT en fragmentos fijos.
+
+        Cada fragmento se copia una vez a una trama propia, porque la vista que
+        devuelve el buffer solo es válida hasta la siguiente lectura y la trama
+        queda en la cola del STT.
+
+        Args:
+            stt_stream: El stream de reconocimiento del STT.
+        """
+        config = settings.agent
+        bytes_per_sample = config.AUDIO_NUM_CHANNELS * 2
+        bytes_per_second = config.AUDIO_SAMPLE_RATE * bytes_per_sample
+        while (chunk := await self.audio_buffer.read(self._chunk_bytes)) is not None:
+            self.usage.add(Metric.STT_AUDIO_SECONDS, len(chunk) / bytes_per_second)
+            frame = rtc.AudioFrame.create(
+                sample_rate=config.AUDIO_SAMPLE_RATE,
+                num_channels=config.AUDIO_NUM_CHANNELS,
+                samples_per_channel=len(chunk) // bytes_per_sample,
+            )
+            frame.data.cast("B")[:] = chunk
+            stt_stream.push_frame(frame)
+
+    def _on_track_subscribed(
+        self,
+        track: rtc.Track,
+        publication: rtc.RemoteTrackPublication,
+        participant: rtc.RemoteParticipant,
+    ):
+        """
+        Empieza a almacenar el audio de una pista remota en cuanto se suscribe.
+
+        Solo se almacena el audio del participante enlazado (el primero que
+        publica audio), para no mezclar en el buffer muestras de varias
+        personas. Si vuelve a publicar una pista, sustituye a la anterior.
+
+        Args:
+            track: La pista a la que se ha suscrito la sala.
+            publication: La publicación de la pista.
+            participant: El participante que publica la pista.
+        """
+        if track.kind != rtc.TrackKind.KIND_AUDIO:
+            return
+        if self._linked_identity is None:
+            self._linked_identity = participant.identity
+        elif participant.identity != self._linked_identity:
+            logger.debug("Ignorando el audio de %s", participant.identity)
+            return
+
+        if self._track_task is not None:
+            self._track_task.cancel()
+        audio_stream = rtc.AudioStream(
+            track,
+            sample_rate=settings.agent.AUDIO_SAMPLE_RATE,
+            num_channels=settings.agent.AUDIO_NUM_CHANNELS,
+        )
+        task = asyncio.create_task(self._buffer_audio(audio_stream))
+        self._track_task = task
+        self._audio_tasks.add(task)
+        task.add_done_callback(self._audio_tasks.discard)
+
     async def _process_stt(self, session: AgentSession):
         """
         Procesa el stream de audio del STT y produce texto finalizado.
 
+        Mientras dura el stream, una tarea en segundo plano lo alimenta con el
+        audio del buffer circular de la sesión.
+
         Args:
             session: La sesión actual del agente.
 
         Yields:
             str: El texto transcrito final de la entrada de voz.
         """
-        async for speech_event in session.stt.stream():
-            if speech_event.is_final:
-                yield speech_event.text
+        stt_stream = session.stt.stream()
+        feeder = asyncio.create_task(self._feed_stt(stt_stream))
+        try:
+            async for speech_event in stt_stream:
+                if self.recorder is not None:
+                    self.recorder.stt(speech_event.text, speech_event.is_final)
+                if speech_event.is_final:
+                    self.usage.add(Metric.STT_FINAL_TRANSCRIPTS)
+                    yield speech_event.text
+        finally:
+            feeder.cancel()
 
     async def _process_llm(self, session: AgentSession, text: str):
         """
         Envía el texto al LLM y produce la respuesta en fragmentos (streaming).
 
+        El stream del LLM se lee en una tarea aparte, de modo que los
+        fragmentos se registran cuando llegan y no cuando el TTS termina de
+        reproducir el anterior.
+
         Args:
             session: La sesión actual del agente.
             text: El texto de entrada para el LLM.
@@ -51,21 +186,70 @@ class MyAgent(Agent):
         Yields:
             str: Fragmentos de la respuesta generada por el LLM.
         """
-        llm_stream = session.llm_stream(text)
-        async for chunk in llm_stream:
-            if chunk.text:
-                yield chunk.text
+        if self.recorder is not None:
+            self.recorder.llm_turn()
+
+        chunks: asyncio.Queue[Optional[str]] = asyncio.Queue()
+
+        async def read_llm():
+            try:
+                async for chunk in session.llm_stream(text):
+                    if chunk.usage is not None:
+                        self.usage.record_llm_usage(chunk.usage)
+                    if chunk.text:
+                        if self.recorder is not None:
+                            self.recorder.llm(chunk.text)
+                        chunks.put_nowait(chunk.text)
+            finally:
+                chunks.put_nowait(None)
+
+        reader = asyncio.create_task(read_llm())
+        try:
+            while (chunk_text := await chunks.get()) is not None:
+                yield chunk_text
+            # Propaga los errores del stream del LLM
+            await reader
+        finally:
+            reader.cancel()
 
     async def _process_tts(self, session: AgentSession, text_stream):
         """
         Consume un stream de texto y lo sintetiza a audio, reproduciéndolo en la sala.
 
+        El texto se reagrupa en fragmentos cuyo tamaño se adapta a la latencia
+        observada del TTS, que se mide en cada petición. Si el primer fragmento
+        del LLM tarda más que `FILLER_DEADLINE`, suena una muletilla y el primer
+        fragmento real se reproduce cuando esta termina.
+
         Args:
             session: La sesión actual del agente.
             text_stream: Un generador asíncrono que produce fragmentos de texto.
         """
-        async for text in text_stream:
-            await session.out_audio.say(text)
+        turn = self.latency_masker.start_turn(session)
+        try:
+            async for text in self.tts_chunker.rechunk(turn.watch(text_stream)):
+                await turn.finish()
+                self.usage.add(Metric.TTS_CHARACTERS, len(text))
+                self.usage.add(Metric.TTS_REQUESTS)
+                started = time.perf_counter()
+                await session.out_audio.say(text)
+                elapsed = time.perf_counter() - started
+                self.tts_chunker.record(len(text), elapsed)
+                if self.recorder is not None:
+                    self.recorder.tts(len(text), elapsed)
+        finally:
+            turn.stop()
+
+    def _on_playback_finished(self, event):
+        """
+        Suma a los contadores de la sala los segundos de audio reproducidos.
+
+        Si la reproducción se interrumpe, solo cuenta la parte que llegó a sonar.
+
+        Args:
+            event: El evento `playback_finished` de la salida de audio.
+        """
+        self.usage.add(Metric.TTS_AUDIO_SECONDS, event.playback_position)
 
     async def _process_chat(self, session: AgentSession):
         """
@@ -75,32 +259,129 @@ class MyAgent(Agent):
             session: La sesión actual del agente.
         """
         async for user_input in self._process_stt(session):
-            logger.info(f"Usuario: {user_input}")
+            logger.info("Usuario: %s", user_input)
 
             llm_stream = self._process_llm(session, user_input)
             await self._process_tts(session, llm_stream)
 
+    def _prewarm_providers(self, session: AgentSession):
+        """
+        Abre por adelantado las conexiones de los proveedores de STT y TTS.
+
+        `prewarm()` no bloquea: cada proveedor abre su conexión en segundo
+        plano, así que se solapa con el arranque de la sesión.
+
+        Args:
+            session: La sesión actual del agente.
+        """
+        for provider in (session.stt, session.tts):
+            if provider is not None:
+                provider.prewarm()
+
+    async def _load_fillers(self, session: AgentSession):
+        """
+        Carga las muletillas de la voz configurada desde la caché en disco,
+        sintetizando solo las que falten.
+
+        Se ejecuta en segundo plano: hasta que terminan de cargarse, los turnos
+        lentos se cuentan en las estadísticas pero no suenan muletillas.
+
+        Args:
+            session: La sesión actual del agente.
+        """
+        try:
+            self.latency_masker.pool = await load_filler_pool(
+                session.tts,
+                settings.elevenlabs.VOICE_ID,
+                settings.agent.FILLER_PHRASES,
+                cache_dir=settings.agent.FILLER_CACHE_DIR or None,
+            )
+        except Exception:
+            logger.exception("No se pudieron cargar las muletillas")
+            return
+        logger.debug("Muletillas cargadas: %d", len(self.latency_masker.pool))
+
+    async def _save_recording(self):
+        """
+        Guarda la grabación de la sesión sin bloquear el bucle de eventos.
+
+        Se llama al terminar la sesión: un error de disco se registra en el log
+        para no ocultar el motivo real del final del trabajo.
+        """
+        try:
+            path = await asyncio.to_thread(self.recorder.save)
+        except OSError as e:
+            logger.warning(
+                "No se pudo guardar la grabación en %s: %s", self.recorder.path, e
+            )
+            return
+        logger.info("Sesión grabada en %s", path)
+
     async def agent_entrypoint(self, ctx: JobContext):
         """
         Punto de entrada principal que se ejecuta cuando el worker recibe un trabajo.
 
         Gestiona la conexión a la sala, la inicialización de la sesión y el inicio
-        del ciclo de procesamiento de chat.
+        del ciclo de procesamiento de chat. `session.start()` ya conecta a la
+        sala en paralelo con el resto de su arranque; las conexiones de los
+        proveedores y la carga de las muletillas se lanzan antes para que
+        avancen mientras tanto.
 
         Args:
             ctx: El contexto del trabajo, proporcionado por el worker de LiveKit.
         """
-        logger.info(f"Agente conectado a la sala: {ctx.room.name}")
+        # Cada trabajo se ejecuta en su propia tarea, así que el contexto de
+        # logging queda limitado a esta sesión
+        bind_session(room=ctx.room.name)
+        logger.info("Agente conectado a la sala: %s", ctx.room.name)
+
+        if settings.agent.RECORD_SESSIONS_DIR:
+            self.recorder = SessionRecorder(
+                recording_path(settings.agent.RECORD_SESSIONS_DIR, ctx.room.name),
+                room=ctx.room.name,
+            )
 
         session = AgentSession(stt=stt, tts=tts, llm=llm)
+        ctx.room.on("track_subscribed", self._on_track_subscribed)
 
+        config = settings.agent
         async with session:  # Usamos async with para gestionar la sesión
-            await session.start(
-                agent=self,
-                room=ctx.room,
-            )
-
-            await ctx.connect()
+            started = time.perf_counter()
+            self._prewarm_providers(session)
+            if config.FILLER_ENABLED and session.tts is not None:
+                # Las muletillas no dependen de la sala: se cargan mientras
+                # la sesión arranca
+                fillers = asyncio.create_task(self._load_fillers(session))
+                self._audio_tasks.add(fillers)
+                fillers.add_done_callback(self._audio_tasks.discard)
 
-            logger.info("Agente listo para escuchar y responder.")
-            await self._process_chat(session)
+            try:
+                try:
+                    async with asyncio.timeout(config.STARTUP_TIMEOUT):
+                        await session.start(agent=self, room=ctx.room)
+                except TimeoutError:
+                    logger.error(
+                        "El arranque de la sesión superó %.1fs", config.STARTUP_TIMEOUT
+                    )
+                    raise
+                # La salida de audio de la sala existe una vez iniciada la sesión
+                if session.output.audio is not None:
+                    session.output.audio.on(
+                        "playback_finished", self._on_playback_finished
+                    )
+                logger.info(
+                    "Agente listo para escuchar y responder (arranque: %.3fs).",
+                    time.perf_counter() - started,
+                )
+                await self._process_chat(session)
+            finally:
+                for task in list(self._audio_tasks):
+                    task.cancel()
+                self.audio_buffer.close()
+                logger.debug(
+                    "Métricas del buffer de audio: %s", self.audio_buffer.metrics()
+                )
+                logger.info("Troceado del TTS: %s", self.tts_chunker.stats())
+                logger.info("Muletillas: %s", self.latency_masker.stats())
+                if self.recorder is not None:
+                    await self._save_recording()
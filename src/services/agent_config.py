@@ -29,7 +29,9 @@ tts = elevenlabs.TTS(  # pragma: no cover
     api_key=settings.elevenlabs.ELEVENLABS_API_KEY,
     voice_id=settings.elevenlabs.VOICE_ID,
 )
-logger.info(f"ElevenLabs TTS inicializado con VOICE_ID: {settings.elevenlabs.VOICE_ID}")
+logger.info(
+    "ElevenLabs TTS inicializado con VOICE_ID: %s", settings.elevenlabs.VOICE_ID
+)
 
 # Inicialización del LLM de Azure OpenAI
 llm = openai.realtime.RealtimeModel.with_azure(  # pragma: no cover
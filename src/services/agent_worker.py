@@ -5,44 +5,129 @@ Este script es el punto de entrada para ejecutar el agente como un servicio
 independiente. Se conecta a LiveKit y espera a que se le asignen trabajos (salas).
 
 Para ejecutarlo, usa el comando:
-`python -m src.services.agent_worker`
+`python -m src.services.agent_worker start`
+
+El logging no se configura al importar el módulo, ya que los procesos de
+trabajo también lo importan: el proceso principal instala la cola en lugar del
+handler del CLI de livekit (`setup_logging`) y cada proceso de trabajo solo
+añade los filtros en `prewarm`.
+
+Por el mismo motivo, la señal de volcado de diagnósticos (SIGUSR1) se registra
+en `prewarm`: cada trabajo corre en su propio proceso, así que la señal debe
+enviarse al pid de ese proceso (`kill -USR1 <pid>`), no al proceso principal.
 """
 
 import logging
+from contextlib import AsyncExitStack
 
-from livekit.agents import WorkerOptions, cli
+from livekit.agents import JobProcess, WorkerOptions, cli
+from livekit.agents.cli import _run
 from livekit.agents.worker import JobContext
 
 from src.core.config import settings
+from src.core.logging_config import configure_job_logging, configure_logging
 from src.services.agent import MyAgent
+from src.services.diagnostics import build_diagnostics
+from src.services.usage import build_usage_accounting
 
-# Configuración de logging
-logging.basicConfig(level=settings.LOG_LEVEL)
 logger = logging.getLogger("agent")
 
+_livekit_setup_logging = _run.setup_logging
+
+# Diagnóstico de recursos por sesión (None si está desactivado)
+diagnostics = build_diagnostics()
+
+# Registro del uso de la sala en JSON Lines, agregado fuera (None si está desactivado)
+usage_accounting = build_usage_accounting()
+
+
+def setup_logging(log_level: str, devmode: bool, console: bool):
+    """
+    Sustituye a `setup_logging` del CLI de livekit en el proceso principal.
+
+    Conserva la configuración de livekit (niveles de los loggers de plugins y
+    loggers ruidosos silenciados) y después reemplaza su handler síncrono de
+    stdout por la cola con hilo de escritura de `configure_logging`.
+
+    Args:
+        log_level: Nivel de log indicado en el CLI.
+        devmode: Si el worker se ejecuta en modo desarrollo.
+        console: Si el worker se ejecuta en modo consola.
+    """
+    _livekit_setup_logging(log_level, devmode, console)
+    configure_logging(
+        level=settings.LOG_LEVEL,
+        json_output=settings.LOG_JSON,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        rate_limit=settings.LOG_RATE_LIMIT,
+        rate_burst=settings.LOG_RATE_BURST,
+    )
+    logger.info("Iniciando worker del agente...")
+
+
+def prewarm(proc: JobProcess):
+    """
+    Inicializa un proceso de trabajo antes de recibir su trabajo.
+
+    Añade los filtros de logging y, si el diagnóstico está activo, registra la
+    señal de volcado en este proceso, que es el único que ve la sesión.
+
+    Args:
+        proc: El proceso de trabajo de livekit.
+    """
+    configure_job_logging(
+        rate_limit=settings.LOG_RATE_LIMIT, rate_burst=settings.LOG_RATE_BURST
+    )
+    if diagnostics is not None:
+        diagnostics.install_dump_signal()
+
 
 async def entrypoint_function(ctx: JobContext):
     """
     Función de entrada que el worker de LiveKit llama para cada trabajo.
 
     Crea una instancia de `MyAgent` y delega el control al punto de entrada
-    del agente (`agent_entrypoint`).
+    del agente (`agent_entrypoint`). Si el diagnóstico está activo, registra
+    los recursos del proceso al inicio y al final de la sesión; si la
+    contabilidad de uso está activa, registra los contadores de la sala.
 
     Args:
         ctx: El contexto del trabajo, proporcionado por el worker.
     """
-    agent_instance = MyAgent()
-    await agent_instance.agent_entrypoint(ctx)
+    async with AsyncExitStack() as stack:
+        if diagnostics is not None:
+            await stack.enter_async_context(diagnostics.track(ctx.room.name))
+        usage = None
+        if usage_accounting is not None:
+            usage = await stack.enter_async_context(
+                usage_accounting.track(ctx.room.name)
+            )
 
+        agent_instance = MyAgent(usage=usage)
+        await agent_instance.agent_entrypoint(ctx)
 
-if __name__ == "__main__":  # pragma: no cover
-    logger.info("Iniciando worker del agente...")
 
-    cli.run_app(  # pragma: no cover
+def main():
+    """Lanza el CLI de livekit con el logging del worker."""
+    # `run_app` llama a `_run.setup_logging` antes de crear el worker
+    _run.setup_logging = setup_logging
+
+    cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint_function,
+            prewarm_fnc=prewarm,
             api_key=settings.livekit.LIVEKIT_API_KEY,
             api_secret=settings.livekit.LIVEKIT_API_SECRET,
             ws_url=settings.livekit.LIVEKIT_URL,
+            # Con nombre, el worker solo atiende despachos explícitos (routers/rooms.py)
+            agent_name=settings.livekit.LIVEKIT_AGENT_NAME,
+            # Cada trabajo corre en su propio proceso; el proceso principal lo
+            # avisa y, con límite, lo cierra si su memoria supera estos umbrales
+            job_memory_warn_mb=settings.diagnostics.JOB_MEMORY_WARN_MB,
+            job_memory_limit_mb=settings.diagnostics.JOB_MEMORY_LIMIT_MB,
         )
     )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,236 @@
+"""
+Buffer circular preasignado para audio PCM.
+
+`PCMRingBuffer` almacena el audio entrante de una sesión en un único
+`bytearray` reservado al crearse y entrega los fragmentos mediante vistas
+(`memoryview`) sobre esa memoria. Las vistas solo son válidas hasta la
+siguiente lectura: quien necesite conservar el audio (por ejemplo, una trama
+que queda en la cola del STT) debe copiarlo, y esa es la única copia entre la
+entrada de la sala y el STT.
+
+Soporta dos políticas cuando el buffer está lleno:
+- "block": el productor espera (con un tiempo máximo) a que haya espacio.
+- "drop_oldest": se descarta el audio más antiguo para hacer sitio al nuevo.
+"""
+
+import asyncio
+from typing import Optional, Union
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class PCMRingBuffer:
+    """
+    Buffer circular de bytes PCM con métricas de ocupación.
+
+    Args:
+        capacity_bytes: Tamaño total del buffer en bytes.
+        max_read_bytes: Tamaño máximo de una lectura. Se reserva un área
+            auxiliar de este tamaño para las lecturas que cruzan el final del
+            buffer circular.
+        policy: Política cuando el buffer está lleno ("block" o "drop_oldest").
+        block_timeout: Segundos máximos que espera un productor con la política
+            "block" antes de descartar el audio más antiguo. `None` espera sin límite.
+        align: Tamaño de una muestra en bytes (muestras * canales). Las
+            lecturas y los descartes se alinean a este tamaño.
+    """
+
+    def __init__(
+        self,
+        capacity_bytes: int,
+        max_read_bytes: int,
+        policy: str = DROP_OLDEST,
+        block_timeout: Optional[float] = None,
+        align: int = 2,
+    ):
+        if policy not in (BLOCK, DROP_OLDEST):
+            raise ValueError(f"Política de buffer no soportada: {policy}")
+        if max_read_bytes > capacity_bytes:
+            raise ValueError("max_read_bytes no puede superar capacity_bytes")
+
+        self.capacity = capacity_bytes - capacity_bytes % align
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.align = align
+
+        self._buffer = bytearray(self.capacity)
+        self._view = memoryview(self._buffer)
+        self._scratch = memoryview(bytearray(max_read_bytes))
+        self._start = 0
+        self._size = 0
+        self._closed = False
+        self._data_available = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._space_available.set()
+
+        # Métricas
+        self.written_bytes = 0
+        self.dropped_bytes = 0
+        self.overruns = 0
+        self.high_watermark = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def free(self) -> int:
+        """Bytes libres en el buffer."""
+        return self.capacity - self._size
+
+    @property
+    def fill_level(self) -> float:
+        """Ocupación actual del buffer, entre 0.0 y 1.0."""
+        return self._size / self.capacity
+
+    @property
+    def closed(self) -> bool:
+        """Indica si el buffer se ha cerrado para escritura."""
+        return self._closed
+
+    def metrics(self) -> dict[str, float]:
+        """
+        Devuelve las métricas de ocupación y descarte del buffer.
+
+        Returns:
+            dict: Nivel de llenado, marca máxima, bytes escritos y descartados y
+            número de desbordamientos.
+        """
+        return {
+            "fill_level": self.fill_level,
+            "high_watermark": self.high_watermark / self.capacity,
+            "written_bytes": self.written_bytes,
+            "dropped_bytes": self.dropped_bytes,
+            "overruns": self.overruns,
+        }
+
+    def _drop(self, nbytes: int):
+        """Descarta `nbytes` del audio más antiguo, alineados al tamaño de muestra."""
+        nbytes = min(self._size, -(-nbytes // self.align) * self.align)
+        self._start = (self._start + nbytes) % self.capacity
+        self._size -= nbytes
+        self.dropped_bytes += nbytes
+        self.overruns += 1
+
+    def _copy_in(self, data: memoryview):
+        """Copia `data` al final del buffer, partiéndolo si cruza el límite."""
+        end = (self._start + self._size) % self.capacity
+        first = min(len(data), self.capacity - end)
+        self._view[end : end + first] = data[:first]
+        if first < len(data):
+            self._view[: len(data) - first] = data[first:]
+
+        self._size += len(data)
+        self.written_bytes += len(data)
+        self.high_watermark = max(self.high_watermark, self._size)
+        self._data_available.set()
+        if self._size == self.capacity:
+            self._space_available.clear()
+
+    def write_nowait(self, data: BytesLike) -> int:
+        """
+        Escribe una trama sin esperar, descartando audio antiguo si no cabe.
+
+        Si la trama no ocupa un número entero de muestras, se descarta la
+        muestra incompleta del final para no desalinear el resto del audio.
+
+        Args:
+            data: Los bytes PCM de la trama (se acepta cualquier objeto con
+                protocolo de buffer, ej. el `memoryview` de un `AudioFrame`).
+
+        Returns:
+            int: Número de bytes descartados para hacer sitio.
+        """
+        if self._closed:
+            raise RuntimeError("No se puede escribir en un buffer cerrado")
+
+        view = memoryview(data).cast("B")
+        partial = len(view) % self.align
+        if partial:
+            self.dropped_bytes += partial
+            view = view[: len(view) - partial]
+        if len(view) > self.capacity:
+            # Solo cabe el final de la trama. La longitud y la capacidad están
+            # alineadas, así que el corte empieza en el límite de una muestra
+            self.dropped_bytes += len(view) - self.capacity
+            view = view[len(view) - self.capacity :]
+
+        dropped = self.dropped_bytes
+        if len(view) > self.free:
+            self._drop(len(view) - self.free)
+        self._copy_in(view)
+        return self.dropped_bytes - dropped
+
+    async def write(self, data: BytesLike) -> int:
+        """
+        Escribe una trama aplicando la política de buffer lleno.
+
+        Con la política "block" espera a que el consumidor libere espacio
+        (hasta `block_timeout` segundos) y, si no lo hace, descarta el audio más
+        antiguo para no detener indefinidamente la entrada de la sala.
+
+        Args:
+            data: Los bytes PCM de la trama.
+
+        Returns:
+            int: Número de bytes descartados para hacer sitio.
+        """
+        needed = min(memoryview(data).nbytes, self.capacity)
+        if self.policy == BLOCK:
+            try:
+                async with asyncio.timeout(self.block_timeout):
+                    while self.free < needed and not self._closed:
+                        self._space_available.clear()
+                        await self._space_available.wait()
+            except TimeoutError:
+                pass
+        return self.write_nowait(data)
+
+    async def read(self, nbytes: int) -> Optional[memoryview]:
+        """
+        Lee hasta `nbytes` del buffer, esperando a que haya datos.
+
+        La vista devuelta apunta a la memoria interna del buffer (o al área
+        auxiliar si el fragmento cruza el final), por lo que debe consumirse o
+        copiarse antes de la siguiente lectura.
+
+        Args:
+            nbytes: Número de bytes a leer. Se recorta a `max_read_bytes` y se
+                alinea al tamaño de muestra.
+
+        Returns:
+            Una `memoryview` con los datos leídos, o `None` si el buffer está
+            cerrado y vacío.
+        """
+        nbytes = min(nbytes, len(self._scratch))
+        nbytes -= nbytes % self.align
+        while self._size < nbytes and not self._closed:
+            self._data_available.clear()
+            await self._data_available.wait()
+
+        nbytes = min(nbytes, self._size - self._size % self.align)
+        if nbytes == 0:
+            return None
+
+        end = self._start + nbytes
+        if end <= self.capacity:
+            chunk = self._view[self._start : end]
+        else:
+            # El fragmento cruza el final: se compone en el área auxiliar
+            first = self.capacity - self._start
+            self._scratch[:first] = self._view[self._start :]
+            self._scratch[first:nbytes] = self._view[: nbytes - first]
+            chunk = self._scratch[:nbytes]
+
+        self._start = end % self.capacity
+        self._size -= nbytes
+        self._space_available.set()
+        return chunk
+
+    def close(self):
+        """Cierra el buffer: las lecturas pendientes devuelven lo que quede."""
+        self._closed = True
+        self._data_available.set()
+        self._space_available.set()
@@ -0,0 +1,278 @@
+"""
+Diagnóstico de recursos del worker del agente.
+
+Este módulo registra el consumo de recursos de cada sesión del agente (RSS,
+tareas de asyncio vivas, sockets abiertos y las principales asignaciones de
+memoria según `tracemalloc`) al inicio y al final de cada trabajo. Con esos
+datos detecta sesiones que crecen por encima de un umbral y permite volcar
+instantáneas bajo demanda.
+
+livekit-agents ejecuta cada trabajo en su propio proceso de un solo uso, así
+que este módulo solo ve una sesión por proceso. El reciclado por memoria lo
+hace el proceso principal del worker con `job_memory_warn_mb` y
+`job_memory_limit_mb` de `WorkerOptions` (ver `agent_worker.py`).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import signal
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import psutil
+
+from src.core.config import settings
+
+logger = logging.getLogger("agent")
+
+# Caracteres que no se admiten en la etiqueta del nombre de archivo
+_UNSAFE_LABEL_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+@dataclass
+class ResourceSnapshot:
+    """Instantánea de los recursos del proceso en un momento dado."""
+
+    timestamp: float
+    rss_bytes: int
+    tasks: int
+    sockets: int
+    top_allocations: list[str] = field(default_factory=list)
+
+
+@dataclass
+class SessionReport:
+    """Resumen de recursos de una sesión, comparando su inicio y su final."""
+
+    session_id: str
+    start: ResourceSnapshot
+    end: ResourceSnapshot
+    leaked: bool
+
+    @property
+    def rss_growth(self) -> int:
+        """Crecimiento de RSS (en bytes) durante la sesión."""
+        return self.end.rss_bytes - self.start.rss_bytes
+
+    @property
+    def task_growth(self) -> int:
+        """Tareas de asyncio que siguen vivas al terminar la sesión."""
+        return self.end.tasks - self.start.tasks
+
+    @property
+    def socket_growth(self) -> int:
+        """Sockets que siguen abiertos al terminar la sesión."""
+        return self.end.sockets - self.start.sockets
+
+
+def _count_tasks() -> int:
+    """Cuenta las tareas de asyncio vivas en el bucle actual (0 si no hay bucle)."""
+    try:
+        return len(asyncio.all_tasks())
+    except RuntimeError:
+        return 0
+
+
+def _count_sockets(process: psutil.Process) -> int:
+    """Cuenta los sockets abiertos por el proceso."""
+    try:
+        return len(process.net_connections(kind="all"))
+    except (psutil.Error, OSError):
+        return 0
+
+
+def take_snapshot(top: int = 0) -> ResourceSnapshot:
+    """
+    Toma una instantánea de los recursos del proceso actual.
+
+    Args:
+        top: Número de asignaciones principales de `tracemalloc` a incluir.
+            Solo tiene efecto si `tracemalloc` está activo.
+
+    Returns:
+        ResourceSnapshot: La instantánea tomada.
+    """
+    process = psutil.Process()
+    allocations = []
+    if top and tracemalloc.is_tracing():
+        stats = tracemalloc.take_snapshot().statistics("lineno")
+        allocations = [str(stat) for stat in stats[:top]]
+
+    return ResourceSnapshot(
+        timestamp=time.time(),
+        rss_bytes=process.memory_info().rss,
+        tasks=_count_tasks(),
+        sockets=_count_sockets(process),
+        top_allocations=allocations,
+    )
+
+
+class WorkerDiagnostics:
+    """
+    Lleva la contabilidad de recursos por sesión y vigila fugas en el proceso.
+
+    Args:
+        leak_threshold_bytes: Crecimiento de RSS por sesión a partir del cual
+            se marca la sesión como sospechosa de fuga.
+        top_allocations: Número de asignaciones de `tracemalloc` a registrar
+            en cada instantánea (0 desactiva `tracemalloc`).
+        dump_dir: Directorio en el que se vuelcan las instantáneas.
+    """
+
+    def __init__(
+        self,
+        leak_threshold_bytes: int,
+        top_allocations: int = 0,
+        dump_dir: Optional[str] = None,
+    ):
+        self.leak_threshold_bytes = leak_threshold_bytes
+        self.top_allocations = top_allocations
+        self.dump_dir = dump_dir
+
+        self.jobs_completed = 0
+        self.reports: list[SessionReport] = []
+        self._active: dict[str, ResourceSnapshot] = {}
+
+    def _snapshot(self) -> ResourceSnapshot:
+        if self.top_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return take_snapshot(self.top_allocations)
+
+    def session_started(self, session_id: str) -> ResourceSnapshot:
+        """
+        Registra el inicio de una sesión.
+
+        Args:
+            session_id: Identificador de la sesión (ej. nombre de la sala).
+
+        Returns:
+            ResourceSnapshot: La instantánea tomada al inicio.
+        """
+        snapshot = self._snapshot()
+        self._active[session_id] = snapshot
+        return snapshot
+
+    def session_ended(self, session_id: str) -> Optional[SessionReport]:
+        """
+        Registra el final de una sesión y comprueba si ha dejado fugas.
+
+        Args:
+            session_id: Identificador de la sesión.
+
+        Returns:
+            El `SessionReport` de la sesión, o `None` si no se registró su inicio.
+        """
+        start = self._active.pop(session_id, None)
+        if start is None:
+            return None
+
+        end = self._snapshot()
+        self.jobs_completed += 1
+        report = SessionReport(
+            session_id=session_id,
+            start=start,
+            end=end,
+            leaked=end.rss_bytes - start.rss_bytes > self.leak_threshold_bytes,
+        )
+        # Solo conservamos los informes recientes para no crear otra fuga
+        self.reports = self.reports[-99:] + [report]
+
+        if report.leaked:
+            logger.warning(
+                "Posible fuga en la sesión %s: RSS +%d bytes, tareas %+d, sockets %+d",
+                session_id,
+                report.rss_growth,
+                report.task_growth,
+                report.socket_growth,
+            )
+            self.dump(f"leak-{session_id}")
+
+        return report
+
+    def dump(self, label: str = "manual") -> Optional[str]:
+        """
+        Vuelca una instantánea y las sesiones activas a un archivo JSON.
+
+        Args:
+            label: Etiqueta que se incluye en el nombre del archivo.
+
+        Returns:
+            La ruta del archivo generado, o `None` si no hay `dump_dir` o no se
+            pudo escribir.
+        """
+        if not self.dump_dir:
+            return None
+
+        # La etiqueta puede incluir el nombre de la sala, que elige el cliente
+        label = _UNSAFE_LABEL_CHARS.sub("_", label)
+        path = os.path.join(
+            self.dump_dir, f"diagnostics-{os.getpid()}-{int(time.time())}-{label}.json"
+        )
+        data = {
+            "pid": os.getpid(),
+            "jobs_completed": self.jobs_completed,
+            "snapshot": asdict(take_snapshot(self.top_allocations or 10)),
+            "active_sessions": {k: asdict(v) for k, v in self._active.items()},
+        }
+        try:
+            os.makedirs(self.dump_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            logger.warning("No se pudo volcar el diagnóstico a %s: %s", path, e)
+            return None
+        logger.info("Instantánea de diagnóstico guardada en %s", path)
+        return path
+
+    def install_dump_signal(self, signum: int = getattr(signal, "SIGUSR1", 0)):
+        """
+        Registra una señal (SIGUSR1 por defecto) para volcar instantáneas bajo demanda.
+
+        Debe llamarse en el proceso de trabajo (ver `prewarm` en `agent_worker.py`):
+        la señal se envía al pid del proceso del trabajo, no al del worker.
+
+        Args:
+            signum: Número de la señal a registrar.
+        """
+        try:
+            signal.signal(signum, lambda *_: self.dump("signal"))
+        except (ValueError, OSError):  # pragma: no cover
+            # Solo el hilo principal puede registrar señales
+            logger.debug("No se pudo registrar la señal de volcado %s", signum)
+
+    @asynccontextmanager
+    async def track(self, session_id: str):
+        """
+        Context manager asíncrono que registra el inicio y el final de una sesión.
+
+        Args:
+            session_id: Identificador de la sesión.
+        """
+        self.session_started(session_id)
+        try:
+            yield
+        finally:
+            self.session_ended(session_id)
+
+
+def build_diagnostics() -> Optional[WorkerDiagnostics]:
+    """
+    Crea un `WorkerDiagnostics` a partir de la configuración.
+
+    Returns:
+        La instancia configurada, o `None` si los diagnósticos están desactivados.
+    """
+    config = settings.diagnostics
+    if not config.ENABLED:
+        return None
+    return WorkerDiagnostics(
+        leak_threshold_bytes=config.LEAK_THRESHOLD_BYTES,
+        top_allocations=config.TRACEMALLOC_TOP,
+        dump_dir=config.DUMP_DIR,
+    )
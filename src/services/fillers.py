@@ -0,0 +1,309 @@
+"""
+Audio de relleno pre-sintetizado para enmascarar la latencia del LLM.
+
+Cuando el primer fragmento del LLM tarda más que un plazo configurable, el
+agente reproduce una muletilla corta ("Mmm...", "A ver...") para que el
+usuario no se quede en silencio. Cada trabajo se ejecuta en un proceso propio
+que no sobrevive a la sesión, así que las muletillas se guardan en disco como
+WAV, una por voz y frase: solo se sintetizan la primera vez y reproducirlas no
+cuesta ninguna petición al TTS.
+
+`LatencyMasker` vigila cada turno: arranca un temporizador al empezar la
+respuesta, lo cancela al llegar el primer fragmento del LLM y, si vence antes,
+reproduce un clip del `FillerPool`. El clip no se corta: el audio real empieza
+cuando termina, en lugar de interrumpirlo y dejar un silencio mientras el TTS
+sintetiza la respuesta.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import time
+import wave
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Optional
+
+from livekit import rtc
+
+logger = logging.getLogger("agent")
+
+# Duración de las tramas en que se trocean los clips leídos de disco
+_FRAME_MS = 20
+
+
+class FillerPool:
+    """
+    Conjunto de muletillas ya sintetizadas para una voz.
+
+    Args:
+        clips: Lista de tuplas `(texto, tramas_de_audio)`.
+    """
+
+    def __init__(self, clips: list[tuple[str, list]]):
+        self.clips = clips
+        self._last: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.clips)
+
+    def pick(self) -> tuple[str, list]:
+        """Elige un clip al azar evitando repetir el anterior."""
+        choices = [i for i in range(len(self.clips)) if i != self._last] or [0]
+        self._last = random.choice(choices)
+        return self.clips[self._last]
+
+
+async def synthesize_clip(tts, text: str) -> list[rtc.AudioFrame]:
+    """
+    Sintetiza un texto completo y devuelve sus tramas de audio.
+
+    Args:
+        tts: El proveedor de TTS.
+        text: El texto a sintetizar.
+
+    Returns:
+        La lista de tramas de audio del clip.
+    """
+    frames = []
+    async with tts.synthesize(text) as stream:
+        async for event in stream:
+            frames.append(event.frame)
+    return frames
+
+
+def _clip_path(cache_dir: str, voice_id: str, phrase: str) -> str:
+    digest = hashlib.sha256(phrase.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, voice_id, f"{digest}.wav")
+
+
+def _save_clip(path: str, frames: list[rtc.AudioFrame]):
+    """Guarda las tramas de un clip como WAV, sin dejar archivos a medias."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with wave.open(tmp_path, "wb") as f:
+        f.setnchannels(frames[0].num_channels)
+        f.setsampwidth(2)
+        f.setframerate(frames[0].sample_rate)
+        for frame in frames:
+            f.writeframes(frame.data)
+    os.replace(tmp_path, path)
+
+
+def _load_clip(path: str) -> list[rtc.AudioFrame]:
+    """Lee un clip WAV y lo trocea en tramas de `_FRAME_MS` milisegundos."""
+    with wave.open(path, "rb") as f:
+        sample_rate, num_channels = f.getframerate(), f.getnchannels()
+        pcm = f.readframes(f.getnframes())
+    frame_bytes = sample_rate * _FRAME_MS // 1000 * num_channels * 2
+    return [
+        rtc.AudioFrame(
+            pcm[i : i + frame_bytes],
+            sample_rate,
+            num_channels,
+            len(pcm[i : i + frame_bytes]) // (num_channels * 2),
+        )
+        for i in range(0, len(pcm), frame_bytes)
+    ]
+
+
+async def _load_or_synthesize(
+    tts, phrase: str, path: Optional[str]
+) -> list[rtc.AudioFrame]:
+    if path is not None and os.path.exists(path):
+        try:
+            return await asyncio.to_thread(_load_clip, path)
+        except (OSError, EOFError, wave.Error) as e:
+            logger.warning("Muletilla en caché ilegible %s: %s", path, e)
+
+    frames = await synthesize_clip(tts, phrase)
+    if path is not None and frames:
+        try:
+            await asyncio.to_thread(_save_clip, path, frames)
+        except OSError as e:
+            logger.warning("No se pudo guardar la muletilla en %s: %s", path, e)
+    return frames
+
+
+async def load_filler_pool(
+    tts, voice_id: str, phrases: list[str], cache_dir: Optional[str] = None
+) -> FillerPool:
+    """
+    Carga las muletillas de una voz, sintetizando solo las que no están en disco.
+
+    Las frases que fallan se descartan y se reintentan en el siguiente trabajo.
+
+    Args:
+        tts: El proveedor de TTS.
+        voice_id: Identificador de la voz, parte de la ruta de la caché.
+        phrases: Las muletillas a cargar.
+        cache_dir: Directorio de la caché en disco. `None` la desactiva.
+
+    Returns:
+        FillerPool: Las muletillas cargadas (posiblemente vacío).
+    """
+    paths = [
+        _clip_path(cache_dir, voice_id, phrase) if cache_dir else None
+        for phrase in phrases
+    ]
+    results = await asyncio.gather(
+        *(
+            _load_or_synthesize(tts, phrase, path)
+            for phrase, path in zip(phrases, paths)
+        ),
+        return_exceptions=True,
+    )
+    clips = []
+    for phrase, result in zip(phrases, results):
+        if isinstance(result, BaseException):
+            logger.warning("No se pudo sintetizar la muletilla %r: %s", phrase, result)
+        elif result:
+            clips.append((phrase, result))
+    return FillerPool(clips)
+
+
+async def _iter_frames(frames: list) -> AsyncIterator:
+    for frame in frames:
+        yield frame
+
+
+class FillerTurn:
+    """
+    Temporizador de relleno de un turno de respuesta.
+
+    Se crea con `LatencyMasker.start_turn`. Si el primer fragmento del LLM no
+    llega antes del plazo, reproduce una muletilla con `session.say`. Antes de
+    reproducir el audio real hay que esperar a `finish()`.
+
+    Args:
+        masker: El `LatencyMasker` que acumula las estadísticas.
+        session: La sesión actual del agente.
+    """
+
+    def __init__(self, masker: "LatencyMasker", session):
+        self._masker = masker
+        self._session = session
+        self._started = time.perf_counter()
+        self._handle = None
+        self._first_chunk = False
+        self._timer = asyncio.get_running_loop().call_later(
+            masker.deadline, self._deadline_missed
+        )
+
+    def _deadline_missed(self):
+        self._masker.deadline_misses += 1
+        pool = self._masker.pool
+        if pool is None or not len(pool):
+            return
+
+        text, frames = pool.pick()
+        try:
+            self._handle = self._session.say(
+                text,
+                audio=_iter_frames(frames),
+                allow_interruptions=True,
+                add_to_chat_ctx=False,
+            )
+        except Exception:
+            logger.exception("No se pudo reproducir la muletilla")
+            return
+        self._masker.fillers_played += 1
+
+    def first_chunk(self):
+        """Marca la llegada del primer fragmento del LLM y cancela el temporizador."""
+        if self._first_chunk:
+            return
+        self._first_chunk = True
+        self._timer.cancel()
+        self._masker.latencies.append(time.perf_counter() - self._started)
+
+    async def finish(self):
+        """
+        Cancela el temporizador y espera a que termine la muletilla que suena.
+
+        Los clips son cortos: dejarlos terminar evita un corte brusco seguido
+        de silencio mientras el TTS sintetiza el primer fragmento real.
+        """
+        self._timer.cancel()
+        handle, self._handle = self._handle, None
+        if handle is not None and not handle.done():
+            await handle.wait_for_playout()
+
+    def stop(self):
+        """Cancela el temporizador e interrumpe la muletilla si está sonando."""
+        self._timer.cancel()
+        handle, self._handle = self._handle, None
+        if handle is not None and not handle.done():
+            handle.interrupt()
+
+    async def watch(self, text_stream: AsyncIterable[str]) -> AsyncIterator[str]:
+        """
+        Reenvía el stream de texto del LLM, marcando la llegada del primer fragmento.
+
+        Args:
+            text_stream: Un iterable asíncrono con los fragmentos del LLM.
+
+        Yields:
+            str: Los mismos fragmentos de texto.
+        """
+        async for text in text_stream:
+            self.first_chunk()
+            yield text
+
+
+class LatencyMasker:
+    """
+    Enmascara la latencia del primer fragmento del LLM con muletillas.
+
+    Args:
+        deadline: Segundos que se espera al primer fragmento antes de
+            reproducir una muletilla.
+        window: Número de turnos recientes usados para los percentiles.
+    """
+
+    def __init__(self, deadline: float, window: int = 200):
+        if deadline <= 0:
+            raise ValueError("deadline debe ser mayor que 0")
+
+        self.deadline = deadline
+        self.pool: Optional[FillerPool] = None
+        self.turns = 0
+        self.deadline_misses = 0
+        self.fillers_played = 0
+        self.latencies: deque[float] = deque(maxlen=window)
+
+    def start_turn(self, session) -> FillerTurn:
+        """
+        Empieza a vigilar un turno de respuesta.
+
+        Args:
+            session: La sesión actual del agente.
+
+        Returns:
+            FillerTurn: El temporizador del turno.
+        """
+        self.turns += 1
+        return FillerTurn(self, session)
+
+    def stats(self) -> dict:
+        """Plazo, tasa de aciertos y latencia del primer fragmento del LLM."""
+        latencies = sorted(self.latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3)
+
+        return {
+            "deadline": self.deadline,
+            "turns": self.turns,
+            "deadline_misses": self.deadline_misses,
+            "fillers_played": self.fillers_played,
+            "hit_rate": (
+                round(1 - self.deadline_misses / self.turns, 3) if self.turns else None
+            ),
+            "first_chunk_p50": percentile(0.5),
+            "first_chunk_p95": percentile(0.95),
+            "pool_size": len(self.pool) if self.pool is not None else 0,
+        }
@@ -0,0 +1,388 @@
+"""
+Grabación y reproducción de sesiones del agente.
+
+`SessionRecorder` captura lo que ve `MyAgent` durante una sesión real: los
+eventos del STT (con su instante y `is_final`), los fragmentos del LLM de cada
+turno y la duración de cada petición al TTS. Se guardan en un archivo JSON
+Lines comprimido con gzip, una lista corta por evento:
+
+    {"v": 1, "room": "sala-1", "started": 1700000000.0}
+    ["s", 0.512, "hola", false]       # evento del STT
+    ["l", 1.204, 0, "Hola, "]         # fragmento del LLM del turno 0
+    ["t", 1.530, 24, 0.812]           # petición al TTS: caracteres y segundos
+
+`ReplaySession` reproduce una grabación contra el pipeline actual
+(`_process_stt` -> `_process_llm` -> `_process_tts`) sin red, a velocidad real
+o acelerada, y genera un `ReplayReport` con la latencia de cada turno y el
+número de peticiones al TTS (los turnos sin audio tienen latencia `None`).
+`compare` calcula las diferencias entre dos informes, por ejemplo entre dos
+versiones del código:
+
+    python -m src.services.replay sesion.jsonl.gz --speed 20 --baseline base.json
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from types import SimpleNamespace
+from typing import Any, Optional
+
+FORMAT_VERSION = 1
+
+# Caracteres que no se permiten del nombre de la sala en el nombre del archivo
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def recording_path(directory: str, room: str) -> str:
+    """
+    Ruta del archivo en el que se graba una sesión de la sala `room`.
+
+    El nombre de la sala lo eligen los clientes, así que se sustituyen los
+    caracteres que no sean seguros en un nombre de archivo (como `/`) para que
+    la grabación quede siempre dentro de `directory`. El nombre real se guarda
+    en la cabecera de la grabación.
+
+    Args:
+        directory: Directorio de las grabaciones.
+        room: Nombre de la sala.
+
+    Returns:
+        str: La ruta del archivo `.jsonl.gz`.
+    """
+    name = _UNSAFE_FILENAME_CHARS.sub("_", room)
+    return os.path.join(directory, f"{name}-{int(time.time())}.jsonl.gz")
+
+
+class SessionRecorder:
+    """
+    Graba los eventos de una sesión del agente en memoria y los guarda al final.
+
+    Args:
+        path: Ruta del archivo `.jsonl.gz` donde se guardará la grabación.
+        room: Nombre de la sala grabada.
+    """
+
+    def __init__(self, path: str, room: str = ""):
+        self.path = path
+        self.header = {"v": FORMAT_VERSION, "room": room, "started": time.time()}
+        self.events: list[list[Any]] = []
+        self._t0 = time.monotonic()
+        self._turn = -1
+
+    def _now(self) -> float:
+        return round(time.monotonic() - self._t0, 4)
+
+    def stt(self, text: str, is_final: bool):
+        """Registra un evento del STT."""
+        self.events.append(["s", self._now(), text, is_final])
+
+    def llm_turn(self):
+        """Marca el inicio de un nuevo turno del LLM."""
+        self._turn += 1
+        self.events.append(["l", self._now(), self._turn, ""])
+
+    def llm(self, text: str):
+        """Registra un fragmento del LLM en el turno actual."""
+        self.events.append(["l", self._now(), self._turn, text])
+
+    def tts(self, chars: int, seconds: float):
+        """Registra una petición al TTS que empezó hace `seconds` segundos."""
+        self.events.append(
+            ["t", round(self._now() - seconds, 4), chars, round(seconds, 4)]
+        )
+
+    def save(self) -> str:
+        """
+        Escribe la grabación en disco.
+
+        Returns:
+            str: La ruta del archivo generado.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(self.header) + "\n")
+            for event in self.events:
+                f.write(
+                    json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n"
+                )
+        return self.path
+
+
+@dataclass
+class Recording:
+    """Una sesión grabada, cargada en memoria."""
+
+    header: dict[str, Any]
+    stt: list[tuple[float, str, bool]] = field(default_factory=list)
+    turns: list[list[tuple[float, str]]] = field(default_factory=list)
+    tts: list[tuple[float, int, float]] = field(default_factory=list)
+
+
+def load_recording(path: str) -> Recording:
+    """
+    Carga una grabación desde un archivo `.jsonl.gz`.
+
+    Args:
+        path: Ruta del archivo.
+
+    Returns:
+        Recording: La grabación, con los fragmentos del LLM agrupados por turno
+        y sus instantes relativos al inicio del turno.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        recording = Recording(header=json.loads(f.readline()))
+        turn_start: dict[int, float] = {}
+        for line in f:
+            kind, t, *data = json.loads(line)
+            if kind == "s":
+                recording.stt.append((t, data[0], data[1]))
+            elif kind == "l":
+                turn, text = data
+                if turn not in turn_start:
+                    turn_start[turn] = t
+                    recording.turns.append([])
+                if text:
+                    recording.turns[turn].append((t - turn_start[turn], text))
+            elif kind == "t":
+                recording.tts.append((t, data[0], data[1]))
+    return recording
+
+
+@dataclass
+class ReplayReport:
+    """
+    Latencia de cada turno (en segundos de la grabación) y peticiones al TTS.
+
+    Hay una entrada por transcripción final; la latencia es `None` si el turno
+    no hizo ninguna petición al TTS.
+    """
+
+    turn_latencies: list[Optional[float]] = field(default_factory=list)
+    tts_requests: list[int] = field(default_factory=list)
+
+    @classmethod
+    def from_recording(cls, recording: Recording) -> "ReplayReport":
+        """
+        Calcula el informe de la sesión tal como ocurrió en producción.
+
+        Args:
+            recording: La grabación.
+
+        Returns:
+            ReplayReport: Latencia desde cada transcripción final hasta la
+            primera petición al TTS posterior, y peticiones hasta el siguiente turno.
+        """
+        finals = [t for t, _, is_final in recording.stt if is_final]
+        report = cls()
+        for i, final in enumerate(finals):
+            end = finals[i + 1] if i + 1 < len(finals) else float("inf")
+            starts = [t for t, _, _ in recording.tts if final <= t < end]
+            report.turn_latencies.append(
+                round(starts[0] - final, 4) if starts else None
+            )
+            report.tts_requests.append(len(starts))
+        return report
+
+
+def compare(baseline: ReplayReport, current: ReplayReport) -> dict[str, Any]:
+    """
+    Compara dos informes de reproducción.
+
+    Args:
+        baseline: Informe de referencia.
+        current: Informe a comparar.
+
+    Returns:
+        dict: Diferencias por turno y totales (valores positivos indican que
+        `current` es más lento o hace más peticiones). La diferencia de
+        latencia de un turno es `None` si alguno de los dos no tiene audio, y
+        esos turnos no cuentan para la media.
+    """
+    pairs = list(zip(baseline.turn_latencies, current.turn_latencies))
+    both = [(b, c) for b, c in pairs if b is not None and c is not None]
+
+    def mean(values: list[float]) -> float:
+        return sum(values) / len(values) if values else 0.0
+
+    return {
+        "turn_latency_delta": [
+            round(c - b, 4) if b is not None and c is not None else None
+            for b, c in pairs
+        ],
+        "tts_requests_delta": [
+            c - b for b, c in zip(baseline.tts_requests, current.tts_requests)
+        ],
+        "mean_latency_delta": round(
+            mean([c for _, c in both]) - mean([b for b, _ in both]), 4
+        ),
+        "total_tts_requests_delta": (
+            sum(current.tts_requests) - sum(baseline.tts_requests)
+        ),
+    }
+
+
+def _fit_tts(tts: list[tuple[float, int, float]]) -> tuple[float, float]:
+    """Ajusta `duración = fija + caracteres * por_carácter` a las peticiones grabadas."""
+    if not tts:
+        return 0.0, 0.0
+    n = len(tts)
+    mean_x = sum(c for _, c, _ in tts) / n
+    mean_y = sum(s for _, _, s in tts) / n
+    var_x = sum((c - mean_x) ** 2 for _, c, _ in tts)
+    if var_x:
+        per_char = sum((c - mean_x) * (s - mean_y) for _, c, s in tts) / var_x
+        if per_char > 0:
+            return max(mean_y - per_char * mean_x, 0.0), per_char
+    return 0.0, mean_y / mean_x if mean_x else 0.0
+
+
+class _ReplaySTTStream:
+    """Stream de STT que reproduce los eventos grabados con sus tiempos."""
+
+    def __init__(self, replay: "ReplaySession"):
+        self._replay = replay
+
+    def push_frame(self, frame):
+        """El audio de entrada se ignora: los eventos vienen de la grabación."""
+
+    async def __aiter__(self):
+        for t, text, is_final in self._replay.recording.stt:
+            await self._replay.sleep_until(t)
+            if is_final:
+                self._replay.mark_final()
+            yield SimpleNamespace(text=text, is_final=is_final)
+
+
+class _ReplayAudioOutput:
+    """Salida de audio que simula la duración de cada petición al TTS."""
+
+    def __init__(self, replay: "ReplaySession"):
+        self._replay = replay
+
+    async def say(self, text: str):
+        self._replay.mark_tts()
+        fixed, per_char = self._replay.tts_model
+        await asyncio.sleep((fixed + len(text) * per_char) / self._replay.speed)
+
+
+class ReplaySession:
+    """
+    Sesión simulada que reproduce una grabación sin red.
+
+    Expone la misma interfaz que usa `MyAgent` de `AgentSession`:
+    `stt.stream()`, `llm_stream(text)` y `out_audio.say(text)`.
+
+    Args:
+        recording: La grabación a reproducir.
+        speed: Factor de velocidad (1.0 tiempo real, 10.0 diez veces más rápido).
+    """
+
+    def __init__(self, recording: Recording, speed: float = 1.0):
+        if speed <= 0:
+            raise ValueError("speed debe ser mayor que 0")
+        self.recording = recording
+        self.speed = speed
+        self.tts_model = _fit_tts(recording.tts)
+        self.stt = SimpleNamespace(
+            stream=lambda: _ReplaySTTStream(self), prewarm=lambda: None
+        )
+        self.tts = None
+        self.out_audio = _ReplayAudioOutput(self)
+        self.report = ReplayReport()
+        self._t0 = time.monotonic()
+        self._turn = 0
+        self._final_at: Optional[float] = None
+
+    def now(self) -> float:
+        """Instante actual en segundos de la grabación."""
+        return (time.monotonic() - self._t0) * self.speed
+
+    async def sleep_until(self, t: float):
+        """Espera hasta el instante `t` de la grabación."""
+        delay = (t - self.now()) / self.speed
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def mark_final(self):
+        self._final_at = self.now()
+        self.report.turn_latencies.append(None)
+        self.report.tts_requests.append(0)
+
+    def mark_tts(self):
+        if self._final_at is None:
+            return
+        if self.report.turn_latencies[-1] is None:
+            self.report.turn_latencies[-1] = round(self.now() - self._final_at, 4)
+        self.report.tts_requests[-1] += 1
+
+    def llm_stream(self, text: str):
+        """Reproduce los fragmentos del siguiente turno grabado del LLM."""
+        turn = (
+            self.recording.turns[self._turn]
+            if self._turn < len(self.recording.turns)
+            else []
+        )
+        self._turn += 1
+
+        async def stream():
+            started = self.now()
+            for offset, chunk in turn:
+                await self.sleep_until(started + offset)
+                yield SimpleNamespace(text=chunk, usage=None)
+
+        return stream()
+
+
+async def replay(agent, recording: Recording, speed: float = 1.0) -> ReplayReport:
+    """
+    Reproduce una grabación contra el ciclo de chat de un agente.
+
+    Args:
+        agent: Una instancia de `MyAgent` (o compatible).
+        recording: La grabación a reproducir.
+        speed: Factor de velocidad de la reproducción.
+
+    Returns:
+        ReplayReport: Latencias por turno y peticiones al TTS medidas.
+    """
+    session = ReplaySession(recording, speed=speed)
+    await agent._process_chat(session)
+    return session.report
+
+
+def main(argv: Optional[list[str]] = None):  # pragma: no cover
+    """Punto de entrada de línea de comandos para reproducir una grabación."""
+    parser = argparse.ArgumentParser(
+        description="Reproduce una sesión grabada del agente."
+    )
+    parser.add_argument("recording", help="Archivo .jsonl.gz de la grabación")
+    parser.add_argument("--speed", type=float, default=1.0, help="Factor de velocidad")
+    parser.add_argument("--baseline", help="Informe JSON de referencia para comparar")
+    parser.add_argument("--output", help="Ruta donde guardar el informe JSON")
+    args = parser.parse_args(argv)
+
+    from src.services.agent import MyAgent
+
+    recording = load_recording(args.recording)
+    report = asyncio.run(replay(MyAgent(), recording, speed=args.speed))
+    result: dict[str, Any] = {
+        "recorded": asdict(ReplayReport.from_recording(recording)),
+        "replayed": asdict(report),
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = ReplayReport(**json.load(f)["replayed"])
+        result["diff"] = compare(baseline, report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
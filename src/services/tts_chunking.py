@@ -0,0 +1,183 @@
+"""
+Troceado adaptativo del texto del LLM para el TTS.
+
+`AdaptiveChunker` agrupa los fragmentos de texto que produce el LLM en
+peticiones de síntesis de tamaño variable: la primera de cada respuesta es
+pequeña para que el audio empiece cuanto antes y las siguientes crecen para
+reducir el coste fijo por petición.
+
+El tamaño objetivo se calcula a partir de la latencia observada del proveedor.
+Con las últimas peticiones se ajusta por mínimos cuadrados el modelo
+`duración = ttfb + caracteres * segundos_por_caracter` y se elige el tamaño con
+el que la latencia fija (ttfb) no supera la fracción `target_overhead` del
+tiempo total de la petición.
+"""
+
+import re
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Optional
+
+# Puntos de corte preferidos: final de frase y, en su defecto, pausas
+_SENTENCE_END = re.compile(r"[.!?¡¿;:…]\s")
+_PAUSE = re.compile(r"[,\s]")
+
+
+class AdaptiveChunker:
+    """
+    Agrupa texto en fragmentos cuyo tamaño se adapta a la latencia del TTS.
+
+    Args:
+        first_chunk_chars: Tamaño del primer fragmento de cada respuesta.
+        min_chunk_chars: Tamaño mínimo de los fragmentos siguientes.
+        max_chunk_chars: Tamaño máximo de cualquier fragmento.
+        target_overhead: Fracción máxima deseada del tiempo de petición que se
+            dedica a la latencia fija del proveedor (entre 0 y 1).
+        window: Número de peticiones recientes usadas para la estimación.
+    """
+
+    def __init__(
+        self,
+        first_chunk_chars: int,
+        min_chunk_chars: int,
+        max_chunk_chars: int,
+        target_overhead: float = 0.2,
+        window: int = 16,
+    ):
+        if not 0 < min_chunk_chars <= max_chunk_chars:
+            raise ValueError("Se requiere 0 < min_chunk_chars <= max_chunk_chars")
+        if not 0 < target_overhead < 1:
+            raise ValueError("target_overhead debe estar entre 0 y 1")
+
+        self.first_chunk_chars = min(first_chunk_chars, max_chunk_chars)
+        self.min_chunk_chars = min_chunk_chars
+        self.max_chunk_chars = max_chunk_chars
+        self.target_overhead = target_overhead
+
+        self._samples: deque[tuple[int, float]] = deque(maxlen=window)
+        self.chosen_sizes: list[int] = []
+
+    def record(self, chars: int, seconds: float):
+        """
+        Registra la duración de una petición de síntesis.
+
+        Args:
+            chars: Caracteres enviados en la petición.
+            seconds: Segundos que tardó la petición.
+        """
+        if chars > 0 and seconds >= 0:
+            self._samples.append((chars, seconds))
+
+    def estimate(self) -> Optional[tuple[float, float]]:
+        """
+        Estima la latencia fija y el tiempo por carácter del proveedor.
+
+        Returns:
+            Una tupla `(ttfb, segundos_por_caracter)`, o `None` si aún no hay
+            suficientes peticiones de tamaños distintos para estimarlos.
+        """
+        n = len(self._samples)
+        if n < 2:
+            return None
+
+        mean_x = sum(x for x, _ in self._samples) / n
+        mean_y = sum(y for _, y in self._samples) / n
+        var_x = sum((x - mean_x) ** 2 for x, _ in self._samples)
+        if var_x == 0:
+            return None
+
+        cov = sum((x - mean_x) * (y - mean_y) for x, y in self._samples)
+        per_char = cov / var_x
+        ttfb = mean_y - per_char * mean_x
+        if per_char <= 0:
+            return None
+        return max(ttfb, 0.0), per_char
+
+    def next_size(self, previous: Optional[int]) -> int:
+        """
+        Calcula el tamaño del siguiente fragmento de una respuesta.
+
+        Args:
+            previous: Tamaño del fragmento anterior, o `None` si es el primero.
+
+        Returns:
+            int: Número de caracteres objetivo del siguiente fragmento.
+        """
+        if previous is None:
+            return self.first_chunk_chars
+
+        target = self.max_chunk_chars
+        estimate = self.estimate()
+        if estimate is not None:
+            ttfb, per_char = estimate
+            overhead = (1 - self.target_overhead) / self.target_overhead
+            target = int(ttfb * overhead / per_char)
+
+        # Crece como mucho al doble en cada paso para no retrasar la respuesta
+        size = min(previous * 2, target)
+        return max(self.min_chunk_chars, min(size, self.max_chunk_chars))
+
+    def _split_point(self, text: str, size: int) -> Optional[int]:
+        """
+        Busca el punto de corte de `text` más cercano a `size` caracteres.
+
+        Prefiere el último final de frase y, en su defecto, la última pausa
+        entre la mitad de `size` y `size`. Si no hay ninguno, corta en el
+        primer punto de corte posterior a `size`.
+        """
+        if len(text) < size:
+            return None
+
+        start = size // 2
+        limit = min(len(text), self.max_chunk_chars)
+        window = text[start:limit]
+        sentence_cuts = [start + m.end() for m in _SENTENCE_END.finditer(window)]
+        pause_cuts = [start + m.end() for m in _PAUSE.finditer(window)]
+        for cuts in (sentence_cuts, pause_cuts):
+            before = [cut for cut in cuts if cut <= size]
+            if before:
+                return before[-1]
+
+        if sentence_cuts or pause_cuts:
+            return min(sentence_cuts + pause_cuts)
+
+        # Sin puntos de corte: solo se corta si se supera el máximo
+        return limit if len(text) >= self.max_chunk_chars else None
+
+    async def rechunk(self, text_stream: AsyncIterable[str]) -> AsyncIterator[str]:
+        """
+        Reagrupa un stream de texto en fragmentos de tamaño adaptativo.
+
+        Args:
+            text_stream: Un iterable asíncrono de fragmentos de texto del LLM.
+
+        Yields:
+            str: Fragmentos de texto listos para sintetizar.
+        """
+        buffer = ""
+        size = self.next_size(None)
+        async for text in text_stream:
+            buffer += text
+            while (cut := self._split_point(buffer, size)) is not None:
+                chunk, buffer = buffer[:cut], buffer[cut:]
+                self.chosen_sizes.append(len(chunk))
+                yield chunk
+                size = self.next_size(size)
+
+        if buffer.strip():
+            self.chosen_sizes.append(len(buffer))
+            yield buffer
+
+    def stats(self) -> dict:
+        """
+        Devuelve los tamaños elegidos y la estimación actual de latencia.
+
+        Returns:
+            dict: Tamaños de fragmento elegidos en la sesión, ttfb y segundos
+            por carácter estimados (o `None` si aún no hay estimación).
+        """
+        estimate = self.estimate()
+        return {
+            "chunk_sizes": list(self.chosen_sizes),
+            "ttfb": estimate[0] if estimate else None,
+            "seconds_per_char": estimate[1] if estimate else None,
+        }
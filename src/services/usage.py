@@ -0,0 +1,222 @@
+"""
+Contabilidad de uso por sala del worker del agente.
+
+Cada sesión acumula sus contadores (segundos de audio enviados al STT,
+transcripciones finales, tokens del LLM, caracteres y peticiones al TTS y
+segundos de audio reproducidos en la sala) en un `RoomUsage`: un array de
+tamaño fijo indexado por `Metric`, barato de actualizar en el camino crítico
+del audio.
+
+LiveKit ejecuta cada trabajo en un proceso propio que no sobrevive a la sesión,
+así que aquí no se agregan salas: `UsageAccounting` solo vuelca los contadores
+de la sala a un archivo JSON Lines compartido por todos los procesos, de forma
+periódica mientras dura y una última vez al terminar. Los totales por worker,
+por periodo o las salas con más consumo se calculan fuera, a partir de ese
+archivo (por ejemplo, con los registros `room_end`).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from array import array
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger("agent")
+
+
+class Metric(IntEnum):
+    """Índices de los contadores de uso de una sala."""
+
+    STT_AUDIO_SECONDS = 0
+    STT_FINAL_TRANSCRIPTS = 1
+    LLM_TOKENS_IN = 2
+    LLM_TOKENS_OUT = 3
+    TTS_CHARACTERS = 4
+    TTS_REQUESTS = 5
+    TTS_AUDIO_SECONDS = 6  # Audio reproducido en la sala, no el sintetizado
+
+
+def _zeros() -> array:
+    return array("d", bytes(8 * len(Metric)))
+
+
+class RoomUsage:
+    """
+    Contadores de uso de una sala, en un array de tamaño fijo.
+
+    Args:
+        room: Nombre de la sala.
+    """
+
+    __slots__ = ("room", "started", "counters")
+
+    def __init__(self, room: str = ""):
+        self.room = room
+        self.started = time.time()
+        self.counters = _zeros()
+
+    def add(self, metric: Metric, value: float = 1):
+        """
+        Suma un valor a un contador.
+
+        Args:
+            metric: El contador a incrementar.
+            value: La cantidad a sumar.
+        """
+        self.counters[metric] += value
+
+    def record_llm_usage(self, usage):
+        """
+        Suma los tokens de entrada y salida de un fragmento del LLM.
+
+        Args:
+            usage: El objeto `usage` del fragmento, con `prompt_tokens` y
+                `completion_tokens`. Los valores que no son enteros se ignoran.
+        """
+        tokens_in = getattr(usage, "prompt_tokens", None)
+        tokens_out = getattr(usage, "completion_tokens", None)
+        if isinstance(tokens_in, int):
+            self.counters[Metric.LLM_TOKENS_IN] += tokens_in
+        if isinstance(tokens_out, int):
+            self.counters[Metric.LLM_TOKENS_OUT] += tokens_out
+
+    def __getitem__(self, metric: Metric) -> float:
+        return self.counters[metric]
+
+    def as_dict(self) -> dict:
+        """Devuelve los contadores con su nombre y la duración de la sesión."""
+        data = {m.name.lower(): round(self.counters[m], 3) for m in Metric}
+        data["duration_seconds"] = round(time.time() - self.started, 3)
+        return data
+
+
+class UsageAccounting:
+    """
+    Registra el uso de las salas atendidas por el proceso en un archivo JSON Lines.
+
+    Args:
+        path: Archivo JSON Lines en el que se vuelcan los contadores.
+        flush_interval: Segundos entre volcados mientras hay salas activas
+            (0 desactiva el volcado periódico).
+    """
+
+    def __init__(self, path: Optional[str], flush_interval: float = 30.0):
+        self.path = path
+        self.flush_interval = flush_interval
+
+        self.active: dict[str, RoomUsage] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def room_started(self, room: str) -> RoomUsage:
+        """
+        Registra el inicio de una sala y devuelve sus contadores.
+
+        Args:
+            room: Nombre de la sala.
+
+        Returns:
+            RoomUsage: Los contadores de la sala.
+        """
+        usage = RoomUsage(room)
+        self.active[room] = usage
+        if self.flush_interval > 0 and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        return usage
+
+    def room_ended(self, room: str) -> Optional[dict]:
+        """
+        Registra el final de una sala.
+
+        Args:
+            room: Nombre de la sala.
+
+        Returns:
+            El resumen de uso de la sala, o `None` si no se registró su inicio.
+        """
+        usage = self.active.pop(room, None)
+        if usage is None:
+            return None
+
+        if not self.active and self._flush_task is not None:
+            # Sin salas activas no hay nada que volcar periódicamente
+            self._flush_task.cancel()
+            self._flush_task = None
+        return usage.as_dict()
+
+    def snapshot(self) -> list[dict]:
+        """Registros a volcar: uno por sala activa."""
+        now = time.time()
+        pid = os.getpid()
+        return [
+            {"type": "room", "ts": now, "pid": pid, "room": room, **usage.as_dict()}
+            for room, usage in self.active.items()
+        ]
+
+    def _write(self, records: list[dict]):
+        if not self.path or not records:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def flush(self, records: Optional[list[dict]] = None):
+        """
+        Escribe los registros en el archivo sin bloquear el bucle de eventos.
+
+        Args:
+            records: Registros a escribir. Por defecto, `snapshot()`.
+        """
+        try:
+            await asyncio.to_thread(self._write, records or self.snapshot())
+        except OSError as e:
+            logger.warning("No se pudo volcar el uso a %s: %s", self.path, e)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    @asynccontextmanager
+    async def track(self, room: str):
+        """
+        Context manager asíncrono que registra el uso de una sala.
+
+        Al salir, escribe y registra en el log el resumen de la sala.
+
+        Args:
+            room: Nombre de la sala.
+
+        Yields:
+            RoomUsage: Los contadores de la sala.
+        """
+        usage = self.room_started(room)
+        try:
+            yield usage
+        finally:
+            report = self.room_ended(room)
+            logger.info("Uso de la sala %s: %s", room, report)
+            final = {"type": "room_end", "ts": time.time(), "pid": os.getpid()}
+            await self.flush([{**final, "room": room, **report}])
+
+
+def build_usage_accounting() -> Optional[UsageAccounting]:
+    """
+    Crea un `UsageAccounting` a partir de la configuración.
+
+    Returns:
+        La instancia configurada, o `None` si la contabilidad está desactivada.
+    """
+    config = settings.usage
+    if not config.ENABLED:
+        return None
+    return UsageAccounting(
+        path=config.FILE,
+        flush_interval=config.FLUSH_INTERVAL,
+    )
@@ -0,0 +1,113 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel
+
+from src.core.codec import FastCodecRoute, FastJSONResponse
+
+
+class Item(BaseModel):
+    name: str
+    quantity: int = 1
+
+
+def build_app(route_class=FastCodecRoute) -> FastAPI:
+    app = FastAPI()
+    router = APIRouter(route_class=route_class)
+
+    @router.post("/items", response_model=dict[str, str])
+    async def create_item(item: Item):
+        return {"name": item.name, "quantity": str(item.quantity)}
+
+    app.include_router(router)
+    return app
+
+
+@pytest.fixture
+async def fast_client():
+    async with AsyncClient(
+        transport=ASGITransport(app=build_app()), base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+@pytest.mark.anyio
+class TestFastCodecRoute:
+    """Pruebas para la ruta optimizada de decodificación/codificación."""
+
+    async def test_valid_request(self, fast_client: AsyncClient):
+        response = await fast_client.post("/items", json={"name": "mic", "quantity": 2})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"name": "mic", "quantity": "2"}
+
+    async def test_missing_field_has_fastapi_error_shape(
+        self, fast_client: AsyncClient
+    ):
+        response = await fast_client.post("/items", json={"quantity": 2})
+
+        assert response.status_code == 422
+        detail = response.json()["detail"]
+        assert detail[0]["type"] == "missing"
+        assert detail[0]["loc"] == ["body", "name"]
+
+    async def test_empty_body(self, fast_client: AsyncClient):
+        response = await fast_client.post("/items")
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body"]
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"content": b"{no es json"},
+            {
+                "content": b'{"name": "mic", "quantity": }',
+                "headers": {"content-type": "application/json"},
+            },
+            {"content": b"name=mic", "headers": {"content-type": "text/plain"}},
+            {"data": {"name": "mic"}},
+            {"json": {"quantity": "muchos"}},
+            {"json": ["mic"]},
+            {},
+        ],
+    )
+    async def test_invalid_json(self, fast_client: AsyncClient, kwargs):
+        """Verifica que los errores sean idénticos a los de `APIRoute`."""
+        async with AsyncClient(
+            transport=ASGITransport(app=build_app(route_class=APIRoute)),
+            base_url="http://test",
+        ) as default_client:
+            expected = await default_client.post("/items", **kwargs)
+
+        response = await fast_client.post("/items", **kwargs)
+
+        assert expected.status_code == 422
+        assert response.json() == expected.json()
+
+    async def test_openapi_schema_unchanged(self):
+        fast = build_app().openapi()
+        default = build_app(route_class=APIRoute).openapi()
+
+        assert fast == default
+
+    async def test_disabled_falls_back_to_default_route(self, monkeypatch):
+        monkeypatch.setattr("src.core.codec.settings.app.FAST_CODEC", False)
+        app = build_app()
+        route = next(r for r in app.routes if getattr(r, "path", None) == "/items")
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            response = await ac.post("/items", json={"name": "mic"})
+
+        assert isinstance(route, FastCodecRoute)
+        assert response.status_code == 200
+        assert response.json() == {"name": "mic", "quantity": "1"}
+
+
+def test_fast_json_response_render():
+    response = FastJSONResponse({"access_token": "abc"})
+    assert response.body == b'{"access_token":"abc"}'
@@ -9,9 +9,16 @@ from src.core.exception_handlers import (
     agent_error_handler,
     generic_exception_handler,
     http_exception_handler,
+    livekit_room_error_handler,
     livekit_token_error_handler,
+    livekit_token_refresh_error_handler,
+)
+from src.core.exceptions import (
+    AgentError,
+    LiveKitRoomError,
+    LiveKitTokenError,
+    LiveKitTokenRefreshError,
 )
-from src.core.exceptions import AgentError, LiveKitTokenError
 
 
 @pytest.mark.anyio
@@ -52,6 +59,22 @@ class TestExceptionHandlers:
         assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert json.loads(response.body) == {"detail": "Invalid token"}
 
+    async def test_livekit_token_refresh_error_handler(self):
+        request = MagicMock(spec=Request)
+        exc = LiveKitTokenRefreshError("Expired token")
+        response = await livekit_token_refresh_error_handler(request, exc)
+        assert isinstance(response, JSONResponse)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert json.loads(response.body) == {"detail": "Expired token"}
+
+    async def test_livekit_room_error_handler(self):
+        request = MagicMock(spec=Request)
+        exc = LiveKitRoomError("Room error")
+        response = await livekit_room_error_handler(request, exc)
+        assert isinstance(response, JSONResponse)
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert json.loads(response.body) == {"detail": "Room error"}
+
     async def test_agent_error_handler(self):
         request = MagicMock(spec=Request)
         exc = AgentError("Agent error")
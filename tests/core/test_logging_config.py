@@ -0,0 +1,133 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from src.core.logging_config import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RateLimitFilter,
+    SessionContextFilter,
+    bind_session,
+    configure_logging,
+    shutdown_logging,
+    unbind_session,
+)
+
+
+def make_record(msg="Usuario: %s", args=("hola",), level=logging.INFO):
+    return logging.LogRecord("agent", level, __file__, 1, msg, args, None)
+
+
+class TestLoggingConfig:
+    """Pruebas unitarias para la configuración de logging no bloqueante."""
+
+    def test_queue_handler_does_not_format(self):
+        """Verifica que el mensaje no se formatee en el hilo que emite."""
+        handler = NonBlockingQueueHandler(queue.Queue())
+        record = make_record()
+
+        handler.emit(record)
+
+        queued = handler.queue.get_nowait()
+        assert queued.msg == "Usuario: %s"
+        assert queued.args == ("hola",)
+
+    def test_queue_handler_drops_when_full(self):
+        """Verifica que una cola llena descarte registros en lugar de bloquear."""
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+        handler.emit(make_record())
+        handler.emit(make_record())
+
+        assert handler.dropped == 1
+
+    def test_session_context_is_added(self):
+        """Verifica que los campos de sesión se copien al registro."""
+        token = bind_session(room="sala-1")
+        try:
+            record = make_record()
+            SessionContextFilter().filter(record)
+        finally:
+            unbind_session(token)
+
+        data = json.loads(JsonFormatter().format(record))
+        assert data["room"] == "sala-1"
+        assert data["msg"] == "Usuario: hola"
+        assert data["level"] == "INFO"
+
+    def test_session_context_from_job_process_is_kept(self):
+        """Los registros reenviados por un proceso de trabajo conservan su contexto."""
+        record = make_record()
+        record.session = {"room": "sala-1"}
+
+        SessionContextFilter().filter(record)
+
+        assert record.session == {"room": "sala-1"}
+
+    def test_rate_limit_filter(self):
+        """Verifica que los mensajes repetidos se limiten y se cuenten los suprimidos."""
+        rate_filter = RateLimitFilter(rate=0.001, burst=2)
+
+        results = [rate_filter.filter(make_record()) for _ in range(4)]
+
+        assert results == [True, True, False, False]
+        # Los avisos y errores nunca se limitan
+        assert rate_filter.filter(make_record(level=logging.WARNING))
+
+    def test_rate_limit_reports_suppressed(self, monkeypatch):
+        clock = iter([0.0, 0.0, 10.0])
+        monkeypatch.setattr(
+            "src.core.logging_config.time.monotonic", lambda: next(clock)
+        )
+        rate_filter = RateLimitFilter(rate=1, burst=1)
+
+        rate_filter.filter(make_record())
+        rate_filter.filter(make_record())
+        record = make_record()
+
+        assert rate_filter.filter(record)
+        assert record.suppressed == 1
+
+    def test_rate_limit_disabled(self):
+        rate_filter = RateLimitFilter(rate=0, burst=1)
+        assert all(rate_filter.filter(make_record()) for _ in range(5))
+
+    def test_json_formatter_includes_exception(self):
+        try:
+            raise ValueError("fallo")
+        except ValueError:
+            record = logging.LogRecord(
+                "agent",
+                logging.ERROR,
+                __file__,
+                1,
+                "Error",
+                (),
+                __import__("sys").exc_info(),
+            )
+
+        data = json.loads(JsonFormatter().format(record))
+        assert "ValueError: fallo" in data["exc"]
+
+    @pytest.fixture
+    def restore_root_logger(self):
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        yield
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+
+    def test_configure_logging(self, restore_root_logger, capsys):
+        """Verifica que los logs se escriban como JSON desde el hilo del listener."""
+        configure_logging("INFO", json_output=True)
+
+        logging.getLogger("agent").info("Agente conectado a la sala: %s", "sala-1")
+        shutdown_logging()
+
+        line = capsys.readouterr().out.strip().splitlines()[-1]
+        assert json.loads(line)["msg"] == "Agente conectado a la sala: sala-1"
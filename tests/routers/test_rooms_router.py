@@ -0,0 +1,176 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from httpx import AsyncClient
+
+from src.main import app
+from src.routers.rooms import get_livekit_api
+
+
+def make_room(request):
+    return SimpleNamespace(
+        name=request.name,
+        sid=f"RM_{request.name}",
+        empty_timeout=request.empty_timeout,
+        max_participants=request.max_participants,
+        creation_time=1700000000,
+        metadata=request.metadata,
+    )
+
+
+def make_dispatch(request):
+    return SimpleNamespace(id="AD_1", agent_name=request.agent_name, room=request.room)
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    monkeypatch.setattr(
+        "src.routers.rooms.settings.livekit.LIVEKIT_AGENT_NAME", "agente"
+    )
+    api = MagicMock()
+    api.room.create_room = AsyncMock(side_effect=make_room)
+    api.agent_dispatch.create_dispatch = AsyncMock(side_effect=make_dispatch)
+    api.agent_dispatch.list_dispatch = AsyncMock(return_value=[])
+    app.dependency_overrides[get_livekit_api] = lambda: api
+    yield api
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.anyio
+class TestRoomsRouter:
+    """Grupo de pruebas para el router de salas."""
+
+    async def test_create_room_with_dispatch(self, client: AsyncClient, mock_api):
+        """Verifica que se cree la sala y se despache el agente."""
+        response = await client.post(
+            "/api/v1/livekit/rooms",
+            json={"name": "sala-1", "max_participants": 2, "agent_metadata": "{}"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["sid"] == "RM_sala-1"
+        assert data["empty_timeout"] == 600
+        assert data["dispatch"] == {
+            "dispatch_id": "AD_1",
+            "agent_name": "agente",
+            "room": "sala-1",
+        }
+        mock_api.agent_dispatch.create_dispatch.assert_awaited_once()
+
+    async def test_create_room_without_dispatch(self, client: AsyncClient, mock_api):
+        response = await client.post(
+            "/api/v1/livekit/rooms", json={"name": "sala-1", "dispatch_agent": False}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["dispatch"] is None
+        mock_api.agent_dispatch.create_dispatch.assert_not_awaited()
+
+    async def test_create_room_default_without_agent_name(
+        self, client: AsyncClient, mock_api, monkeypatch
+    ):
+        """Sin `LIVEKIT_AGENT_NAME`, por defecto se crea la sala sin despacho."""
+        monkeypatch.setattr("src.routers.rooms.settings.livekit.LIVEKIT_AGENT_NAME", "")
+
+        response = await client.post("/api/v1/livekit/rooms", json={"name": "sala-1"})
+
+        assert response.status_code == 200
+        assert response.json()["dispatch"] is None
+        mock_api.agent_dispatch.create_dispatch.assert_not_awaited()
+
+    async def test_dispatch_without_agent_name_creates_no_room(
+        self, client: AsyncClient, mock_api, monkeypatch
+    ):
+        monkeypatch.setattr("src.routers.rooms.settings.livekit.LIVEKIT_AGENT_NAME", "")
+
+        response = await client.post(
+            "/api/v1/livekit/rooms", json={"name": "sala-1", "dispatch_agent": True}
+        )
+
+        assert response.status_code == 500
+        mock_api.room.create_room.assert_not_awaited()
+
+    async def test_create_room_reuses_existing_dispatch(
+        self, client: AsyncClient, mock_api
+    ):
+        """Verifica que reintentar la creación no duplique el despacho."""
+        mock_api.agent_dispatch.list_dispatch.return_value = [
+            SimpleNamespace(id="AD_otro", agent_name="otro", room="sala-1"),
+            SimpleNamespace(id="AD_0", agent_name="agente", room="sala-1"),
+        ]
+
+        response = await client.post("/api/v1/livekit/rooms", json={"name": "sala-1"})
+
+        assert response.status_code == 200
+        assert response.json()["dispatch"]["dispatch_id"] == "AD_0"
+        mock_api.agent_dispatch.create_dispatch.assert_not_awaited()
+
+    async def test_create_rooms_bulk_retry_after_partial_failure(
+        self, client: AsyncClient, mock_api
+    ):
+        """Al reintentar un bloque que falló a medias, cada sala tiene un solo despacho."""
+        dispatched: dict[str, list] = {}
+        failures = ["sala-2"]
+
+        async def create_dispatch(request):
+            if request.room in failures:
+                failures.remove(request.room)
+                raise RuntimeError("servidor caído")
+            dispatched.setdefault(request.room, []).append(request)
+            return make_dispatch(request)
+
+        async def list_dispatch(room):
+            return [make_dispatch(r) for r in dispatched.get(room, [])]
+
+        mock_api.agent_dispatch.create_dispatch.side_effect = create_dispatch
+        mock_api.agent_dispatch.list_dispatch.side_effect = list_dispatch
+        rooms = {"rooms": [{"name": f"sala-{i}"} for i in range(4)]}
+
+        first = await client.post("/api/v1/livekit/rooms/bulk", json=rooms)
+        retry = await client.post("/api/v1/livekit/rooms/bulk", json=rooms)
+
+        assert first.status_code == 500
+        assert retry.status_code == 200
+        assert sorted(dispatched) == [f"sala-{i}" for i in range(4)]
+        assert all(len(requests) == 1 for requests in dispatched.values())
+
+    async def test_create_rooms_bulk(self, client: AsyncClient, mock_api):
+        """Verifica la creación de varias salas en una sola solicitud."""
+        rooms = [{"name": f"sala-{i}"} for i in range(5)]
+
+        response = await client.post(
+            "/api/v1/livekit/rooms/bulk", json={"rooms": rooms}
+        )
+
+        assert response.status_code == 200
+        assert [room["name"] for room in response.json()] == [r["name"] for r in rooms]
+        assert mock_api.room.create_room.await_count == 5
+
+    async def test_dispatch_agent(self, client: AsyncClient, mock_api):
+        response = await client.post(
+            "/api/v1/livekit/rooms/sala-1/dispatch", json={"metadata": "{}"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["room"] == "sala-1"
+
+    async def test_dispatch_requires_agent_name(
+        self, client: AsyncClient, mock_api, monkeypatch
+    ):
+        monkeypatch.setattr("src.routers.rooms.settings.livekit.LIVEKIT_AGENT_NAME", "")
+
+        response = await client.post("/api/v1/livekit/rooms/sala-1/dispatch", json={})
+
+        assert response.status_code == 500
+        assert "LIVEKIT_AGENT_NAME" in response.json()["detail"]
+
+    async def test_create_room_error(self, client: AsyncClient, mock_api):
+        """Verifica que un fallo de LiveKit se traduzca en LiveKitRoomError."""
+        mock_api.room.create_room.side_effect = RuntimeError("servidor caído")
+
+        response = await client.post("/api/v1/livekit/rooms", json={"name": "sala-1"})
+
+        assert response.status_code == 500
+        assert "Could not create room 'sala-1'" in response.json()["detail"]
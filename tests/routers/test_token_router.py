@@ -1,5 +1,23 @@
+import time
+
+import jwt
 import pytest
 from httpx import AsyncClient
+from livekit.api import AccessToken, RoomConfiguration, SIPGrants, VideoGrants
+
+from src.core.config import settings
+from src.routers.token import refresh_cache
+
+TOKEN_REQUEST_DATA = {
+    "room_name": "test-room",
+    "identity": "test-user",
+    "name": "Test User",
+    "metadata": '{"role": "tester"}',
+}
+
+
+def decode(token: str) -> dict:
+    return jwt.decode(token, options={"verify_signature": False})
 
 
 @pytest.mark.anyio
@@ -43,3 +61,163 @@ class TestTokenRouter:
         response_data = response.json()
         assert "detail" in response_data
         assert "Could not generate LiveKit token" in response_data["detail"]
+
+    async def test_generate_token_validation_error(self, client: AsyncClient):
+        """Verifica que un cuerpo inválido devuelva el error 422 estándar de FastAPI."""
+        response = await client.post("/api/v1/livekit/token", json={"identity": "u"})
+
+        assert response.status_code == 422
+        detail = response.json()["detail"]
+        assert detail[0]["type"] == "missing"
+        assert detail[0]["loc"] == ["body", "room_name"]
+
+    async def test_generate_token_ttl(self, client: AsyncClient, monkeypatch):
+        """Verifica que la duración del token se limite al máximo configurado."""
+        monkeypatch.setattr(
+            "src.routers.token.settings.livekit.LIVEKIT_TOKEN_MAX_TTL_SECONDS", 600
+        )
+
+        default = await client.post("/api/v1/livekit/token", json=TOKEN_REQUEST_DATA)
+        too_long = await client.post(
+            "/api/v1/livekit/token", json={**TOKEN_REQUEST_DATA, "ttl_seconds": 7200}
+        )
+
+        claims = decode(default.json()["access_token"])
+        assert claims["exp"] - claims["nbf"] == 600
+        claims = decode(too_long.json()["access_token"])
+        assert claims["exp"] - claims["nbf"] == 600
+
+    async def test_refresh_token(self, client: AsyncClient):
+        """Verifica que un token válido se renueve con la misma identidad y permisos."""
+        refresh_cache.clear()
+        response = await client.post("/api/v1/livekit/token", json=TOKEN_REQUEST_DATA)
+        old_token = response.json()["access_token"]
+
+        response = await client.post(
+            "/api/v1/livekit/token/refresh",
+            json={"access_token": old_token, "ttl_seconds": 60},
+        )
+
+        assert response.status_code == 200
+        new_token = response.json()["access_token"]
+        old_claims, new_claims = decode(old_token), decode(new_token)
+        assert new_token != old_token
+        assert new_claims["sub"] == old_claims["sub"] == "test-user"
+        assert new_claims["video"] == old_claims["video"]
+        assert new_claims["metadata"] == old_claims["metadata"]
+        assert new_claims["exp"] - new_claims["nbf"] == 60
+
+    async def test_refresh_token_is_cached(self, client: AsyncClient):
+        """Verifica que renovar dos veces el mismo token devuelva el mismo resultado."""
+        refresh_cache.clear()
+        response = await client.post("/api/v1/livekit/token", json=TOKEN_REQUEST_DATA)
+        body = {"access_token": response.json()["access_token"], "ttl_seconds": 60}
+
+        first = await client.post("/api/v1/livekit/token/refresh", json=body)
+        second = await client.post("/api/v1/livekit/token/refresh", json=body)
+
+        assert first.json() == second.json()
+
+    async def test_refresh_cache_depends_on_ttl(self, client: AsyncClient):
+        """Verifica que una renovación con otra duración no use la caché."""
+        refresh_cache.clear()
+        response = await client.post("/api/v1/livekit/token", json=TOKEN_REQUEST_DATA)
+        old_token = response.json()["access_token"]
+
+        short = await client.post(
+            "/api/v1/livekit/token/refresh",
+            json={"access_token": old_token, "ttl_seconds": 60},
+        )
+        long = await client.post(
+            "/api/v1/livekit/token/refresh",
+            json={"access_token": old_token, "ttl_seconds": 120},
+        )
+
+        claims = decode(long.json()["access_token"])
+        assert long.json() != short.json()
+        assert claims["exp"] - claims["nbf"] == 120
+
+    async def test_refresh_keeps_all_grants(self, client: AsyncClient):
+        """Verifica que la renovación conserve el tipo, SIP y la configuración de sala."""
+        refresh_cache.clear()
+        old_token = (
+            AccessToken(
+                settings.livekit.LIVEKIT_API_KEY, settings.livekit.LIVEKIT_API_SECRET
+            )
+            .with_identity("agente")
+            .with_kind("agent")
+            .with_grants(VideoGrants(room="test-room", room_join=True, agent=True))
+            .with_sip_grants(SIPGrants(admin=True))
+            .with_room_preset("consulta")
+            .with_room_config(RoomConfiguration(max_participants=2))
+            .to_jwt()
+        )
+
+        response = await client.post(
+            "/api/v1/livekit/token/refresh", json={"access_token": old_token}
+        )
+
+        assert response.status_code == 200
+        old_claims = decode(old_token)
+        new_claims = decode(response.json()["access_token"])
+        for claim in ("kind", "video", "sip", "roomPreset", "roomConfig", "iss"):
+            assert new_claims[claim] == old_claims[claim]
+        assert new_claims["auth_time"] == old_claims["nbf"]
+
+    async def test_refresh_respects_max_lifetime(
+        self, client: AsyncClient, monkeypatch
+    ):
+        """Verifica que las renovaciones no pasen de la vida máxima del token."""
+        refresh_cache.clear()
+        monkeypatch.setattr(
+            "src.routers.token.settings.livekit.LIVEKIT_TOKEN_MAX_LIFETIME_SECONDS", 300
+        )
+        now = int(time.time())
+        livekit = settings.livekit
+
+        def issue(auth_time: int) -> str:
+            claims = {
+                "sub": "test-user",
+                "iss": livekit.LIVEKIT_API_KEY,
+                "video": {"room": "test-room", "roomJoin": True},
+                "auth_time": auth_time,
+                "nbf": now,
+                "exp": now + 60,
+            }
+            return jwt.encode(claims, livekit.LIVEKIT_API_SECRET, algorithm="HS256")
+
+        recent = await client.post(
+            "/api/v1/livekit/token/refresh",
+            json={"access_token": issue(now - 100), "ttl_seconds": 900},
+        )
+        expired = await client.post(
+            "/api/v1/livekit/token/refresh", json={"access_token": issue(now - 300)}
+        )
+
+        claims = decode(recent.json()["access_token"])
+        assert claims["auth_time"] == now - 100
+        assert claims["exp"] == now + 200
+        assert expired.status_code == 401
+        assert "maximum lifetime" in expired.json()["detail"]
+
+    async def test_refresh_invalid_token(self, client: AsyncClient):
+        """Verifica que un token inválido devuelva 401."""
+        response = await client.post(
+            "/api/v1/livekit/token/refresh", json={"access_token": "no-es-un-jwt"}
+        )
+
+        assert response.status_code == 401
+        assert "Invalid or expired LiveKit token" in response.json()["detail"]
+
+    async def test_refresh_token_signed_with_other_secret(self, client: AsyncClient):
+        forged = jwt.encode(
+            {"sub": "intruso", "iss": "otra-clave", "exp": 9999999999},
+            "otro-secreto-suficientemente-largo",
+            algorithm="HS256",
+        )
+
+        response = await client.post(
+            "/api/v1/livekit/token/refresh", json={"access_token": forged}
+        )
+
+        assert response.status_code == 401
@@ -1,8 +1,13 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from src.core.config import settings
 from src.services.agent import MyAgent
+from src.services.audio_buffer import PCMRingBuffer
+from src.services.fillers import FillerPool, LatencyMasker
+from src.services.usage import Metric
 from livekit.agents import AgentSession
 from livekit.agents.worker import JobContext
 
@@ -35,6 +40,82 @@ class TestAgentLogic:
         results = [text async for text in agent._process_stt(mock_session)]
 
         assert results == ["Hola mundo"]
+        assert agent.usage[Metric.STT_FINAL_TRANSCRIPTS] == 1
+
+    async def test_buffer_audio_and_feed_stt(self):
+        """Verifica que el audio pase por el buffer circular hasta el stream del STT."""
+        agent = MyAgent()
+        stt_stream = MagicMock()
+        chunk_bytes = agent._chunk_bytes
+
+        async def audio_gen():
+            for _ in range(2):
+                event = MagicMock()
+                event.frame.data = memoryview(bytes(chunk_bytes))
+                yield event
+
+        with patch("src.services.agent.rtc") as mock_rtc:
+            # El fin de una pista no cierra el buffer: el participante puede
+            # volver a publicar audio
+            await agent._buffer_audio(audio_gen())
+            assert not agent.audio_buffer.closed
+            await agent._buffer_audio(audio_gen())
+            agent.audio_buffer.close()
+            await agent._feed_stt(stt_stream)
+
+        assert agent.usage[Metric.STT_AUDIO_SECONDS] == pytest.approx(
+            4 * settings.agent.AUDIO_CHUNK_MS / 1000
+        )
+        assert stt_stream.push_frame.call_count == 4
+        assert mock_rtc.AudioFrame.create.call_args.kwargs["samples_per_channel"] == (
+            chunk_bytes // 2
+        )
+
+    async def test_feed_stt_frames_survive_wrapping_reads(self):
+        """Las tramas enviadas al STT no cambian al leer de nuevo cruzando el final."""
+        agent = MyAgent()
+        chunk_bytes = agent._chunk_bytes
+        agent.audio_buffer = PCMRingBuffer(
+            capacity_bytes=chunk_bytes * 3 // 2, max_read_bytes=chunk_bytes
+        )
+        stt_stream = MagicMock()
+        feeder = asyncio.create_task(agent._feed_stt(stt_stream))
+
+        for value in range(1, 6):
+            agent.audio_buffer.write_nowait(bytes([value]) * chunk_bytes)
+            await asyncio.sleep(0)
+        agent.audio_buffer.close()
+        await feeder
+
+        frames = [call.args[0] for call in stt_stream.push_frame.call_args_list]
+        assert [bytes(frame.data.cast("B")) for frame in frames] == [
+            bytes([value]) * chunk_bytes for value in range(1, 6)
+        ]
+
+    async def test_only_linked_participant_is_buffered(self):
+        """Verifica que solo se almacene el audio del primer participante."""
+        agent = MyAgent()
+
+        def participant(identity):
+            return MagicMock(identity=identity)
+
+        with (
+            patch("src.services.agent.rtc") as mock_rtc,
+            patch.object(MyAgent, "_buffer_audio", new_callable=AsyncMock),
+        ):
+            track = MagicMock(kind=mock_rtc.TrackKind.KIND_AUDIO)
+            agent._on_track_subscribed(track, MagicMock(), participant("ana"))
+            first_task = agent._track_task
+            agent._on_track_subscribed(track, MagicMock(), participant("luis"))
+            assert agent._track_task is first_task
+
+            # Si el mismo participante vuelve a publicar, sustituye a la pista anterior
+            agent._on_track_subscribed(track, MagicMock(), participant("ana"))
+            await asyncio.sleep(0)
+
+        assert agent._track_task is not first_task
+        assert first_task.cancelled()
+        assert mock_rtc.AudioStream.call_count == 2
 
     async def test_process_llm_stream(self):
         """Verifica que _process_llm procese el stream del LLM correctamente."""
@@ -58,6 +139,37 @@ class TestAgentLogic:
         assert results == ["Hace sol", " y calor."]
         mock_session.llm_stream.assert_called_once_with(input_text)
 
+    async def test_usage_counters(self):
+        """Verifica que el pipeline actualice los contadores de uso de la sala."""
+        agent = MyAgent()
+        mock_session = AsyncMock()
+
+        chunk = MagicMock()
+        chunk.text = "Hola."
+        chunk.usage.prompt_tokens = 12
+        chunk.usage.completion_tokens = 3
+
+        async def llm_gen():
+            yield chunk
+
+        mock_session.llm_stream = MagicMock(return_value=llm_gen())
+
+        await agent._process_tts(mock_session, agent._process_llm(mock_session, "hola"))
+
+        assert agent.usage[Metric.LLM_TOKENS_IN] == 12
+        assert agent.usage[Metric.LLM_TOKENS_OUT] == 3
+        assert agent.usage[Metric.TTS_CHARACTERS] == len("Hola.")
+        assert agent.usage[Metric.TTS_REQUESTS] == 1
+
+    async def test_playback_counts_played_audio(self):
+        """Verifica que solo se cuente el audio que llegó a reproducirse."""
+        agent = MyAgent()
+
+        agent._on_playback_finished(MagicMock(playback_position=1.5, interrupted=False))
+        agent._on_playback_finished(MagicMock(playback_position=0.25, interrupted=True))
+
+        assert agent.usage[Metric.TTS_AUDIO_SECONDS] == pytest.approx(1.75)
+
     async def test_process_tts(self):
         """Verifica que _process_tts llame al motor de TTS con el texto correcto."""
         agent = MyAgent()
@@ -69,9 +181,33 @@ class TestAgentLogic:
 
         await agent._process_tts(mock_session, text_stream())
 
-        assert mock_session.out_audio.say.call_count == 2
-        mock_session.out_audio.say.assert_any_call("Hola.")
-        mock_session.out_audio.say.assert_any_call(" Adiós.")
+        # Los fragmentos cortos se agrupan hasta el tamaño del primer fragmento
+        mock_session.out_audio.say.assert_called_once_with("Hola. Adiós.")
+        assert agent.tts_chunker.chosen_sizes == [len("Hola. Adiós.")]
+
+    async def test_process_tts_masks_slow_llm(self):
+        """Verifica que una respuesta lenta del LLM reproduzca una muletilla que
+        termina antes de reproducir el audio real."""
+        agent = MyAgent()
+        agent.latency_masker = LatencyMasker(deadline=0.01)
+        agent.latency_masker.pool = FillerPool([("Mmm...", [MagicMock()])])
+        mock_session = AsyncMock()
+        filler = MagicMock()
+        filler.done.return_value = False
+        filler.wait_for_playout = AsyncMock()
+        mock_session.say = MagicMock(return_value=filler)
+        mock_session.out_audio.say.side_effect = lambda _: filler.wait_for_playout.assert_awaited_once()
+
+        async def text_stream():
+            await asyncio.sleep(0.05)
+            yield "Hola."
+
+        await agent._process_tts(mock_session, text_stream())
+
+        mock_session.say.assert_called_once()
+        mock_session.out_audio.say.assert_called_once_with("Hola.")
+        filler.interrupt.assert_not_called()
+        assert agent.latency_masker.stats()["fillers_played"] == 1
 
     @patch.object(MyAgent, '_process_stt') # Patch with default MagicMock
     @patch.object(MyAgent, '_process_llm', new_callable=AsyncMock)
@@ -117,5 +253,49 @@ class TestAgentLogic:
 
         MockAgentSession.assert_called_once()
         mock_session_instance.start.assert_called_once_with(agent=agent, room=mock_ctx.room)
-        mock_ctx.connect.assert_called_once()
-        mock_process_chat.assert_called_once_with(mock_session_instance)
\ No newline at end of file
+        mock_process_chat.assert_called_once_with(mock_session_instance)
+
+    @patch('src.services.agent.AgentSession', new_callable=MagicMock)
+    @patch.object(MyAgent, '_process_chat', new_callable=AsyncMock)
+    async def test_agent_entrypoint_startup_failure(self, mock_process_chat, MockAgentSession):
+        """
+        Verifica que si falla el arranque de la sesión no se inicie el ciclo de chat.
+        """
+        agent = MyAgent()
+        mock_ctx = AsyncMock(spec=JobContext)
+        mock_ctx.room = MagicMock()
+        mock_ctx.room.name = "test-room"
+
+        mock_session_instance = MockAgentSession.return_value
+        mock_session_instance.start = AsyncMock(side_effect=ConnectionError("sin conexión"))
+
+        with pytest.raises(ConnectionError):
+            await agent.agent_entrypoint(mock_ctx)
+
+        mock_session_instance.stt.prewarm.assert_called_once()
+        mock_session_instance.tts.prewarm.assert_called_once()
+        mock_process_chat.assert_not_called()
+
+    @patch('src.services.agent.settings.agent.STARTUP_TIMEOUT', 0.01)
+    @patch('src.services.agent.AgentSession', new_callable=MagicMock)
+    @patch.object(MyAgent, '_process_chat', new_callable=AsyncMock)
+    async def test_agent_entrypoint_startup_timeout(self, mock_process_chat, MockAgentSession, caplog):
+        """
+        Verifica que un arranque de la sesión que no termina se corte por tiempo.
+        """
+        agent = MyAgent()
+        mock_ctx = AsyncMock(spec=JobContext)
+        mock_ctx.room = MagicMock()
+        mock_ctx.room.name = "test-room"
+
+        mock_session_instance = MockAgentSession.return_value
+        async def never_starts(**kwargs):
+            await asyncio.Event().wait()
+
+        mock_session_instance.start = AsyncMock(side_effect=never_starts)
+
+        with pytest.raises(TimeoutError):
+            await agent.agent_entrypoint(mock_ctx)
+
+        assert "El arranque de la sesión superó" in caplog.text
+        mock_process_chat.assert_not_called()
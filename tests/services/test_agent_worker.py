@@ -1,18 +1,27 @@
+import logging
+import sys
 from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
+from livekit.agents.cli import _run
+from livekit.agents.worker import JobContext
 
-# Importar la función que queremos probar
-from src.services.agent_worker import entrypoint_function
+from src.core.logging_config import (
+    NonBlockingQueueHandler,
+    SessionContextFilter,
+    shutdown_logging,
+)
 
-# Importar las clases que necesitamos mockear
-from src.services.agent import MyAgent
-from livekit.agents.worker import JobContext
+# Importar la función que queremos probar
+from src.services.agent_worker import entrypoint_function, main, prewarm
+from src.services.usage import UsageAccounting
 
 pytestmark = pytest.mark.anyio
 
 class TestAgentWorker:
     """Pruebas unitarias para el worker del agente."""
 
+    @patch('src.services.agent_worker.usage_accounting', None)
     @patch('src.services.agent_worker.MyAgent')
     async def test_entrypoint_function(self, MockMyAgent):
         """
@@ -33,3 +42,99 @@ class TestAgentWorker:
 
         # Afirmar que agent_entrypoint fue llamado con el contexto correcto
         mock_agent_instance.agent_entrypoint.assert_called_once_with(mock_job_context)
+
+    @patch('src.services.agent_worker.MyAgent')
+    async def test_entrypoint_function_tracks_usage(self, MockMyAgent, tmp_path):
+        """
+        Verifica que el agente reciba los contadores de la sala y que se
+        vuelquen al terminar el trabajo.
+        """
+        accounting = UsageAccounting(str(tmp_path / "usage.jsonl"), flush_interval=0)
+        mock_agent_instance = MockMyAgent.return_value
+        mock_agent_instance.agent_entrypoint = AsyncMock()
+        mock_job_context = AsyncMock(spec=JobContext)
+        mock_job_context.room = MagicMock()
+        mock_job_context.room.name = "test-room"
+
+        with patch('src.services.agent_worker.usage_accounting', accounting):
+            await entrypoint_function(mock_job_context)
+
+        usage = MockMyAgent.call_args.kwargs["usage"]
+        assert usage.room == "test-room"
+        assert accounting.active == {}
+        assert (tmp_path / "usage.jsonl").exists()
+
+
+@pytest.fixture
+def restore_root_logger(monkeypatch):
+    # `main` sustituye `_run.setup_logging`; monkeypatch la restaura al terminar
+    monkeypatch.setattr(_run, "setup_logging", _run.setup_logging)
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    shutdown_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+class TestWorkerLogging:
+    """Pruebas del logging del worker con el CLI real de livekit."""
+
+    def test_run_app_uses_queue_handler_only(self, restore_root_logger, monkeypatch):
+        """
+        Verifica que, tras el `setup_logging` de livekit, el logger raíz solo
+        tenga el handler de la cola (sin el StreamHandler síncrono de livekit).
+        """
+        seen_handlers = []
+
+        def fake_worker(*args, **kwargs):
+            # `run_worker` crea el worker justo después de configurar el logging
+            seen_handlers.extend(restore_root_logger.handlers)
+            worker = MagicMock()
+            worker.run = AsyncMock()
+            worker.drain = AsyncMock()
+            worker.aclose = AsyncMock()
+            return worker
+
+        monkeypatch.setattr(_run, "Worker", fake_worker)
+        monkeypatch.setattr(sys, "argv", ["agent_worker", "start"])
+
+        with pytest.raises(SystemExit):
+            main()
+
+        assert len(seen_handlers) == 1
+        assert isinstance(seen_handlers[0], NonBlockingQueueHandler)
+
+    @patch('src.services.agent_worker.diagnostics', None)
+    def test_prewarm_adds_filters_without_new_handlers(self, restore_root_logger):
+        """Verifica que en el proceso de trabajo solo se añadan filtros."""
+        for handler in restore_root_logger.handlers[:]:
+            restore_root_logger.removeHandler(handler)
+        forwarder = logging.NullHandler()
+        restore_root_logger.addHandler(forwarder)
+
+        prewarm(MagicMock())
+
+        assert restore_root_logger.handlers == [forwarder]
+        assert any(isinstance(f, SessionContextFilter) for f in forwarder.filters)
+
+    @patch('signal.signal')
+    def test_import_does_not_register_dump_signal(self, mock_signal):
+        """Verifica que importar el módulo no registre la señal de volcado."""
+        import importlib
+
+        import src.services.agent_worker
+
+        importlib.reload(src.services.agent_worker)
+
+        mock_signal.assert_not_called()
+
+    @patch('src.services.agent_worker.diagnostics')
+    def test_prewarm_registers_dump_signal(self, mock_diagnostics, restore_root_logger):
+        """Verifica que la señal de volcado se registre en el proceso de trabajo."""
+        prewarm(MagicMock())
+
+        mock_diagnostics.install_dump_signal.assert_called_once_with()
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from src.services.audio_buffer import BLOCK, DROP_OLDEST, PCMRingBuffer
+
+pytestmark = pytest.mark.anyio
+
+
+class TestPCMRingBuffer:
+    """Pruebas unitarias para el buffer circular de audio PCM."""
+
+    async def test_write_and_read_returns_view(self):
+        """Verifica que la lectura devuelva una vista sobre la memoria interna."""
+        buffer = PCMRingBuffer(capacity_bytes=8, max_read_bytes=4)
+
+        buffer.write_nowait(b"\x01\x02\x03\x04")
+        chunk = await buffer.read(4)
+
+        assert isinstance(chunk, memoryview)
+        assert chunk.obj is buffer._buffer
+        assert bytes(chunk) == b"\x01\x02\x03\x04"
+        assert len(buffer) == 0
+
+    async def test_read_across_wrap_uses_scratch(self):
+        """Verifica que un fragmento que cruza el final se lea correctamente."""
+        buffer = PCMRingBuffer(capacity_bytes=8, max_read_bytes=6)
+        buffer.write_nowait(b"aabbcc")
+        await buffer.read(4)
+
+        buffer.write_nowait(b"ddee")
+        chunk = await buffer.read(6)
+
+        assert bytes(chunk) == b"ccddee"
+
+    async def test_drop_oldest_policy(self):
+        """Verifica que se descarte el audio más antiguo al llenarse."""
+        buffer = PCMRingBuffer(capacity_bytes=8, max_read_bytes=8, policy=DROP_OLDEST)
+        buffer.write_nowait(b"aabbccdd")
+
+        dropped = await buffer.write(b"ee")
+        chunk = await buffer.read(8)
+
+        assert dropped == 2
+        assert bytes(chunk) == b"bbccddee"
+        assert buffer.metrics()["overruns"] == 1
+        assert buffer.metrics()["high_watermark"] == 1.0
+
+    async def test_oversized_frame_keeps_tail(self):
+        buffer = PCMRingBuffer(capacity_bytes=4, max_read_bytes=4)
+
+        buffer.write_nowait(b"aabbcc")
+
+        assert bytes(await buffer.read(4)) == b"bbcc"
+        assert buffer.dropped_bytes == 2
+
+    async def test_unaligned_write_drops_partial_sample(self):
+        """Una trama con una muestra incompleta no desalinea el audio siguiente."""
+        buffer = PCMRingBuffer(capacity_bytes=16, max_read_bytes=4)
+
+        buffer.write_nowait(b"\x01\x02\x03\x04\x05\x06\x07\x08\x09")
+        buffer.write_nowait(b"\x0a\x0b")
+
+        assert len(buffer) == 10
+        assert buffer.dropped_bytes == 1
+        assert bytes(await buffer.read(4)) == b"\x01\x02\x03\x04"
+        assert bytes(await buffer.read(4)) == b"\x05\x06\x07\x08"
+        assert bytes(await buffer.read(2)) == b"\x0a\x0b"
+
+    async def test_unaligned_oversized_frame_keeps_aligned_tail(self):
+        buffer = PCMRingBuffer(capacity_bytes=4, max_read_bytes=4, align=4)
+
+        buffer.write_nowait(b"aaaabbbbcc")
+
+        assert bytes(await buffer.read(4)) == b"bbbb"
+        assert buffer.dropped_bytes == 6
+
+    async def test_block_policy_waits_for_space(self):
+        """Verifica que la política "block" espere a que el consumidor lea."""
+        buffer = PCMRingBuffer(capacity_bytes=4, max_read_bytes=4, policy=BLOCK)
+        buffer.write_nowait(b"aabb")
+
+        writer = asyncio.create_task(buffer.write(b"cc"))
+        await asyncio.sleep(0)
+        assert not writer.done()
+
+        assert bytes(await buffer.read(2)) == b"aa"
+        assert await writer == 0
+        assert bytes(await buffer.read(4)) == b"bbcc"
+
+    async def test_block_policy_timeout_drops_oldest(self):
+        buffer = PCMRingBuffer(
+            capacity_bytes=4, max_read_bytes=4, policy=BLOCK, block_timeout=0.01
+        )
+        buffer.write_nowait(b"aabb")
+
+        assert await buffer.write(b"cc") == 2
+
+    async def test_read_waits_for_data(self):
+        buffer = PCMRingBuffer(capacity_bytes=8, max_read_bytes=4)
+
+        reader = asyncio.create_task(buffer.read(4))
+        await asyncio.sleep(0)
+        assert not reader.done()
+
+        buffer.write_nowait(b"aabb")
+        assert bytes(await reader) == b"aabb"
+
+    async def test_close_flushes_remaining_and_ends(self):
+        buffer = PCMRingBuffer(capacity_bytes=8, max_read_bytes=4)
+        buffer.write_nowait(b"aa")
+        buffer.close()
+
+        assert bytes(await buffer.read(4)) == b"aa"
+        assert await buffer.read(4) is None
+        with pytest.raises(RuntimeError):
+            buffer.write_nowait(b"bb")
+
+    async def test_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            PCMRingBuffer(capacity_bytes=8, max_read_bytes=4, policy="otra")
+        with pytest.raises(ValueError):
+            PCMRingBuffer(capacity_bytes=4, max_read_bytes=8)
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from src.services.diagnostics import (
+    ResourceSnapshot,
+    WorkerDiagnostics,
+    build_diagnostics,
+    take_snapshot,
+)
+
+
+def make_snapshot(rss: int, tasks: int = 1, sockets: int = 0) -> ResourceSnapshot:
+    return ResourceSnapshot(timestamp=0.0, rss_bytes=rss, tasks=tasks, sockets=sockets)
+
+
+class TestDiagnostics:
+    """Pruebas unitarias para el diagnóstico de recursos del worker."""
+
+    def test_take_snapshot(self):
+        """Verifica que la instantánea contenga valores del proceso actual."""
+        snapshot = take_snapshot()
+
+        assert snapshot.rss_bytes > 0
+        assert snapshot.sockets >= 0
+        assert snapshot.top_allocations == []
+
+    def test_session_without_leak(self, monkeypatch):
+        """Verifica que una sesión sin crecimiento no se marque como fuga."""
+        snapshots = iter([make_snapshot(100), make_snapshot(150)])
+        monkeypatch.setattr(
+            "src.services.diagnostics.take_snapshot", lambda top=0: next(snapshots)
+        )
+        diagnostics = WorkerDiagnostics(leak_threshold_bytes=1000)
+
+        diagnostics.session_started("sala")
+        report = diagnostics.session_ended("sala")
+
+        assert report.leaked is False
+        assert report.rss_growth == 50
+        assert diagnostics.jobs_completed == 1
+
+    def test_session_with_leak_dumps_snapshot(self, monkeypatch, tmp_path):
+        """Verifica que una sesión que supera el umbral se marque y se vuelque."""
+        snapshots = iter([make_snapshot(100), make_snapshot(5000, tasks=3, sockets=2)])
+        monkeypatch.setattr(
+            "src.services.diagnostics.take_snapshot",
+            lambda top=0: next(snapshots, make_snapshot(5000)),
+        )
+        diagnostics = WorkerDiagnostics(
+            leak_threshold_bytes=1000, dump_dir=str(tmp_path)
+        )
+
+        diagnostics.session_started("sala")
+        report = diagnostics.session_ended("sala")
+
+        assert report.leaked is True
+        assert report.task_growth == 2
+        assert report.socket_growth == 2
+        dumps = list(tmp_path.iterdir())
+        assert len(dumps) == 1
+        assert json.loads(dumps[0].read_text())["jobs_completed"] == 1
+
+    def test_unknown_session_is_ignored(self):
+        diagnostics = WorkerDiagnostics(leak_threshold_bytes=1000)
+        assert diagnostics.session_ended("desconocida") is None
+
+    def test_dump_without_dir(self):
+        assert WorkerDiagnostics(leak_threshold_bytes=0).dump() is None
+
+    def test_dump_sanitizes_label(self, tmp_path):
+        """Verifica que una etiqueta con separadores no salga de `dump_dir`."""
+        diagnostics = WorkerDiagnostics(leak_threshold_bytes=0, dump_dir=str(tmp_path))
+
+        path = diagnostics.dump("leak-../sala/uno")
+
+        assert path is not None
+        assert [p.name for p in tmp_path.iterdir()] == [path.rsplit("/", 1)[1]]
+
+    def test_dump_error_is_logged(self, tmp_path, caplog):
+        """Verifica que un error de disco se registre sin propagarse."""
+        (tmp_path / "archivo").write_text("")
+        diagnostics = WorkerDiagnostics(
+            leak_threshold_bytes=0, dump_dir=str(tmp_path / "archivo")
+        )
+
+        assert diagnostics.dump() is None
+        assert "No se pudo volcar el diagnóstico" in caplog.text
+
+    @pytest.mark.anyio
+    async def test_track_context_manager(self):
+        """Verifica que `track` registre el inicio y el final aunque haya errores."""
+        diagnostics = WorkerDiagnostics(leak_threshold_bytes=10**12)
+
+        with pytest.raises(RuntimeError):
+            async with diagnostics.track("sala"):
+                raise RuntimeError("fallo")
+
+        assert diagnostics.jobs_completed == 1
+        assert diagnostics.reports[0].session_id == "sala"
+
+    def test_build_diagnostics_disabled(self, monkeypatch):
+        monkeypatch.setattr(
+            "src.services.diagnostics.settings.diagnostics.ENABLED", False
+        )
+        assert build_diagnostics() is None
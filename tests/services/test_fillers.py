@@ -0,0 +1,179 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from livekit import rtc
+
+from src.services.fillers import FillerPool, LatencyMasker, load_filler_pool
+
+pytestmark = pytest.mark.anyio
+
+
+def make_frame(value: int, samples: int = 480) -> rtc.AudioFrame:
+    data = value.to_bytes(2, "little", signed=True) * samples
+    return rtc.AudioFrame(data, 24000, 1, samples)
+
+
+class FakeStream:
+    def __init__(self, text):
+        self.text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        return None
+
+    async def __aiter__(self):
+        for i in range(2):
+            yield MagicMock(frame=make_frame(len(self.text) + i))
+
+
+class FakeTTS:
+    def __init__(self, fail=()):
+        self.fail = fail
+        self.calls = []
+
+    def synthesize(self, text):
+        self.calls.append(text)
+        if text in self.fail:
+            raise RuntimeError("proveedor caído")
+        return FakeStream(text)
+
+
+async def slow_stream(delay, *parts):
+    await asyncio.sleep(delay)
+    for part in parts:
+        yield part
+
+
+class TestFillerPool:
+    """Pruebas para la síntesis y caché de muletillas."""
+
+    async def test_load_is_cached_on_disk_per_voice(self, tmp_path):
+        """Verifica que cada muletilla se sintetice una sola vez por voz."""
+        tts = FakeTTS()
+
+        pool = await load_filler_pool(tts, "voz-1", ["Mmm...", "A ver..."], tmp_path)
+        again = await load_filler_pool(tts, "voz-1", ["Mmm...", "A ver..."], tmp_path)
+        await load_filler_pool(tts, "voz-2", ["Mmm..."], tmp_path)
+
+        assert tts.calls == ["Mmm...", "A ver...", "Mmm..."]
+        assert [text for text, _ in again.clips] == ["Mmm...", "A ver..."]
+        for (_, synthesized), (_, loaded) in zip(pool.clips, again.clips):
+            assert b"".join(bytes(f.data) for f in loaded) == b"".join(
+                bytes(f.data) for f in synthesized
+            )
+            assert loaded[0].sample_rate == 24000
+            assert loaded[0].samples_per_channel == 480
+
+    async def test_failed_phrases_are_skipped(self, tmp_path):
+        tts = FakeTTS(fail={"A ver..."})
+
+        pool = await load_filler_pool(tts, "voz-1", ["Mmm...", "A ver..."], tmp_path)
+        await load_filler_pool(tts, "voz-1", ["Mmm...", "A ver..."], tmp_path)
+
+        assert [text for text, _ in pool.clips] == ["Mmm..."]
+        # Solo se reintenta la frase que falló
+        assert tts.calls == ["Mmm...", "A ver...", "A ver..."]
+
+    async def test_unreadable_cache_is_resynthesized(self, tmp_path):
+        tts = FakeTTS()
+        await load_filler_pool(tts, "voz-1", ["Mmm..."], tmp_path)
+        for path in (tmp_path / "voz-1").iterdir():
+            path.write_bytes(b"no es un wav")
+
+        pool = await load_filler_pool(tts, "voz-1", ["Mmm..."], tmp_path)
+
+        assert len(pool) == 1
+        assert tts.calls == ["Mmm...", "Mmm..."]
+
+    async def test_without_cache_dir(self):
+        tts = FakeTTS()
+
+        await load_filler_pool(tts, "voz-1", ["Mmm..."])
+        await load_filler_pool(tts, "voz-1", ["Mmm..."])
+
+        assert tts.calls == ["Mmm...", "Mmm..."]
+
+    async def test_pick_avoids_repeats(self):
+        pool = FillerPool([("a", [1]), ("b", [2])])
+
+        picks = [pool.pick()[0] for _ in range(6)]
+
+        assert all(x != y for x, y in zip(picks, picks[1:]))
+
+
+class TestLatencyMasker:
+    """Pruebas para el enmascarado de la latencia del LLM."""
+
+    async def test_fast_first_chunk_plays_no_filler(self):
+        masker = LatencyMasker(deadline=0.05)
+        masker.pool = FillerPool([("Mmm...", ["trama"])])
+        session = MagicMock()
+
+        turn = masker.start_turn(session)
+        result = [text async for text in turn.watch(slow_stream(0, "Hola"))]
+        await asyncio.sleep(0.1)
+        turn.stop()
+
+        assert result == ["Hola"]
+        session.say.assert_not_called()
+        assert masker.stats()["hit_rate"] == 1.0
+
+    async def test_slow_first_chunk_plays_filler_to_the_end(self):
+        """Verifica que una respuesta lenta reproduzca una muletilla sin cortarla."""
+        masker = LatencyMasker(deadline=0.02)
+        masker.pool = FillerPool([("Mmm...", ["trama"])])
+        session = MagicMock()
+        handle = session.say.return_value
+        handle.done.return_value = False
+        handle.wait_for_playout = AsyncMock()
+
+        turn = masker.start_turn(session)
+        result = [text async for text in turn.watch(slow_stream(0.1, "Hola"))]
+        await turn.finish()
+        turn.stop()
+
+        assert result == ["Hola"]
+        args, kwargs = session.say.call_args
+        assert args == ("Mmm...",)
+        assert kwargs["add_to_chat_ctx"] is False
+        assert [frame async for frame in kwargs["audio"]] == ["trama"]
+        handle.wait_for_playout.assert_awaited_once()
+        handle.interrupt.assert_not_called()
+
+        stats = masker.stats()
+        assert stats["deadline_misses"] == stats["fillers_played"] == 1
+        assert stats["hit_rate"] == 0.0
+        assert stats["first_chunk_p50"] >= 0.1
+
+    async def test_missed_deadline_without_pool(self):
+        """Sin muletillas cargadas, el turno lento solo se cuenta."""
+        masker = LatencyMasker(deadline=0.01)
+        session = MagicMock()
+
+        turn = masker.start_turn(session)
+        await asyncio.sleep(0.05)
+        turn.stop()
+
+        session.say.assert_not_called()
+        assert masker.stats()["deadline_misses"] == 1
+        assert masker.stats()["fillers_played"] == 0
+
+    async def test_stop_interrupts_filler(self):
+        """Si el turno se cancela, la muletilla se interrumpe."""
+        masker = LatencyMasker(deadline=0.01)
+        masker.pool = FillerPool([("Mmm...", ["trama"])])
+        session = MagicMock()
+        session.say.return_value.done.return_value = False
+
+        turn = masker.start_turn(session)
+        await asyncio.sleep(0.05)
+        turn.stop()
+
+        session.say.return_value.interrupt.assert_called_once()
+
+    async def test_invalid_deadline(self):
+        with pytest.raises(ValueError):
+            LatencyMasker(deadline=0)
@@ -0,0 +1,168 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.replay import (
+    Recording,
+    ReplayReport,
+    ReplaySession,
+    SessionRecorder,
+    compare,
+    load_recording,
+    recording_path,
+    replay,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def make_recording() -> Recording:
+    return Recording(
+        header={"v": 1, "room": "sala"},
+        stt=[(0.0, "ho", False), (0.1, "hola", True), (1.0, "adiós", True)],
+        turns=[[(0.2, "Hola, "), (0.3, "¿qué tal?")], [(0.1, "Hasta luego.")]],
+        tts=[(0.5, 10, 0.2), (0.8, 30, 0.4), (1.3, 12, 0.24)],
+    )
+
+
+class PipelineAgent:
+    """Agente mínimo con el mismo ciclo STT -> LLM -> TTS que MyAgent."""
+
+    async def _process_chat(self, session):
+        async for event in session.stt.stream():
+            if not event.is_final:
+                continue
+            async for chunk in session.llm_stream(event.text):
+                await session.out_audio.say(chunk.text)
+
+
+class TestReplay:
+    """Pruebas para la grabación y reproducción de sesiones."""
+
+    async def test_record_and_load_roundtrip(self, tmp_path):
+        """Verifica que una grabación guardada se cargue con los mismos eventos."""
+        recorder = SessionRecorder(str(tmp_path / "sesion.jsonl.gz"), room="sala")
+        recorder.stt("hola", True)
+        recorder.llm_turn()
+        recorder.llm("Hola, ")
+        recorder.llm("¿qué tal?")
+        recorder.tts(15, 0.0)
+
+        recording = load_recording(recorder.save())
+
+        assert recording.header["room"] == "sala"
+        assert [(text, final) for _, text, final in recording.stt] == [("hola", True)]
+        assert [text for _, text in recording.turns[0]] == ["Hola, ", "¿qué tal?"]
+        assert recording.tts[0][1:] == (15, 0.0)
+
+    async def test_report_from_recording(self):
+        report = ReplayReport.from_recording(make_recording())
+
+        assert report.turn_latencies == [0.4, 0.3]
+        assert report.tts_requests == [2, 1]
+
+    async def test_replay_measures_turns(self):
+        """Verifica que la reproducción mida latencias y peticiones por turno."""
+        report = await replay(PipelineAgent(), make_recording(), speed=50)
+
+        assert report.tts_requests == [2, 1]
+        assert len(report.turn_latencies) == 2
+        # La latencia del primer turno incluye la espera del primer fragmento del LLM
+        assert report.turn_latencies[0] == pytest.approx(0.2, abs=0.1)
+
+    async def test_replay_with_my_agent(self):
+        """Verifica que la reproducción funcione contra el pipeline real de MyAgent."""
+        from src.services.agent import MyAgent
+
+        report = await replay(MyAgent(), make_recording(), speed=50)
+
+        assert len(report.tts_requests) == 2
+        assert all(requests >= 1 for requests in report.tts_requests)
+
+    async def test_turn_without_tts_keeps_indexes(self):
+        """Un turno sin audio no desplaza las latencias de los turnos siguientes."""
+        recording = make_recording()
+        recording.turns[0] = []
+        recording.tts = [(1.3, 12, 0.24)]
+
+        recorded = ReplayReport.from_recording(recording)
+        replayed = await replay(PipelineAgent(), recording, speed=50)
+
+        assert recorded.turn_latencies == [None, 0.3]
+        assert recorded.tts_requests == [0, 1]
+        assert replayed.turn_latencies[0] is None
+        assert replayed.turn_latencies[1] is not None
+        assert replayed.tts_requests == [0, 1]
+
+    async def test_llm_timings_exclude_tts_playback(self, tmp_path):
+        """Los fragmentos del LLM se graban al llegar, no al terminar el TTS."""
+        from src.services.agent import MyAgent
+
+        agent = MyAgent()
+        agent.recorder = SessionRecorder(str(tmp_path / "sesion.jsonl.gz"))
+        session = ReplaySession(make_recording(), speed=1)
+        session.llm_stream = lambda _: chunks()
+
+        async def chunks():
+            first = "Una primera frase larga que llena el primer fragmento. "
+            for text in (first, "Y una segunda."):
+                yield SimpleNamespace(text=text, usage=None)
+
+        async def slow_say(_):
+            await asyncio.sleep(0.2)
+
+        session.out_audio.say = slow_say
+
+        await agent._process_tts(session, agent._process_llm(session, "hola"))
+
+        turn = load_recording(agent.recorder.save()).turns[0]
+        assert len(turn) == 2
+        assert turn[1][0] < 0.1
+
+    async def test_recording_path_stays_in_directory(self, tmp_path):
+        """Los nombres de sala con separadores no salen del directorio."""
+        for room in ("sala/uno", "../../x", "sala uno"):
+            path = recording_path(str(tmp_path), room)
+
+            assert os.path.dirname(path) == str(tmp_path)
+            recorder = SessionRecorder(path, room=room)
+            assert load_recording(recorder.save()).header["room"] == room
+
+    async def test_save_error_does_not_escape(self, tmp_path, caplog):
+        """Un error al guardar la grabación solo se registra en el log."""
+        from src.services.agent import MyAgent
+
+        (tmp_path / "archivo").write_text("")
+        agent = MyAgent()
+        agent.recorder = SessionRecorder(str(tmp_path / "archivo" / "s.jsonl.gz"))
+
+        await agent._save_recording()
+
+        assert "No se pudo guardar la grabación" in caplog.text
+
+    async def test_invalid_speed(self):
+        with pytest.raises(ValueError):
+            ReplaySession(make_recording(), speed=0)
+
+    async def test_compare(self):
+        baseline = ReplayReport(turn_latencies=[0.5, 0.4], tts_requests=[3, 2])
+        current = ReplayReport(turn_latencies=[0.3, 0.4], tts_requests=[2, 2])
+
+        diff = compare(baseline, current)
+
+        assert diff["turn_latency_delta"] == [-0.2, 0.0]
+        assert diff["tts_requests_delta"] == [-1, 0]
+        assert diff["mean_latency_delta"] == -0.1
+        assert diff["total_tts_requests_delta"] == -1
+
+    async def test_compare_with_silent_turns(self):
+        baseline = ReplayReport(turn_latencies=[None, 0.4, 0.5], tts_requests=[0, 2, 1])
+        current = ReplayReport(turn_latencies=[0.2, 0.3, None], tts_requests=[1, 2, 0])
+
+        diff = compare(baseline, current)
+
+        assert diff["turn_latency_delta"] == [None, -0.1, None]
+        assert diff["mean_latency_delta"] == -0.1
+        assert diff["total_tts_requests_delta"] == 0
@@ -0,0 +1,135 @@
+import re
+
+import pytest
+
+from src.services.tts_chunking import AdaptiveChunker
+
+
+async def stream(*parts):
+    for part in parts:
+        yield part
+
+
+def make_chunker(**kwargs) -> AdaptiveChunker:
+    options = {"first_chunk_chars": 10, "min_chunk_chars": 5, "max_chunk_chars": 80}
+    options.update(kwargs)
+    return AdaptiveChunker(**options)
+
+
+class TestAdaptiveChunker:
+    """Pruebas unitarias para el troceado adaptativo del TTS."""
+
+    @pytest.mark.anyio
+    async def test_first_chunk_is_small_and_cut_at_sentence(self):
+        """Verifica que el primer fragmento sea pequeño y termine en una frase."""
+        chunker = make_chunker()
+        text = "Hola Ana. Hoy hace sol y calor en la ciudad, así que sal a pasear."
+        words = re.findall(r"\S+\s*", text)
+
+        chunks = [c async for c in chunker.rechunk(stream(*words))]
+
+        assert chunks[0] == "Hola Ana. "
+        assert "".join(chunks) == text
+        assert chunker.chosen_sizes == [len(c) for c in chunks]
+
+    @pytest.mark.anyio
+    async def test_large_delta_keeps_first_chunk_small(self):
+        """Verifica que un fragmento grande del LLM no agrande el primer fragmento."""
+        chunker = make_chunker(first_chunk_chars=40, max_chunk_chars=400)
+        text = (
+            "Claro, te cuento cómo llegar a la estación de tren desde aquí. "
+            "Sal por la puerta principal, gira a la derecha y sigue recto unos "
+            "doscientos metros hasta ver el puente."
+        )
+        assert len(text) > 150
+
+        chunks = [c async for c in chunker.rechunk(stream(text))]
+
+        assert len(chunks[0]) <= 40
+        assert chunks[0] == "Claro, te cuento cómo llegar a la "
+        assert "".join(chunks) == text
+
+    @pytest.mark.anyio
+    async def test_large_delta_cuts_after_size_without_earlier_boundary(self):
+        """Sin puntos de corte antes del tamaño pedido, se corta en el siguiente."""
+        chunker = make_chunker(first_chunk_chars=10, max_chunk_chars=400)
+        text = "Supercalifragilístico y además otras muchas palabras más."
+
+        chunks = [c async for c in chunker.rechunk(stream(text))]
+
+        assert chunks[0] == "Supercalifragilístico "
+        assert "".join(chunks) == text
+
+    @pytest.mark.anyio
+    async def test_chunks_grow_without_estimate(self):
+        """Sin estimación de latencia, los fragmentos crecen geométricamente."""
+        chunker = make_chunker()
+        words = ["palabra "] * 40
+
+        chunks = [c async for c in chunker.rechunk(stream(*words))]
+
+        assert len(chunks[1]) > len(chunks[0])
+        assert all(len(c) <= 80 for c in chunks)
+
+    @pytest.mark.anyio
+    async def test_hard_cut_at_max_without_boundaries(self):
+        chunker = make_chunker(first_chunk_chars=80)
+
+        chunks = [c async for c in chunker.rechunk(stream("x" * 100))]
+
+        assert chunks == ["x" * 80, "x" * 20]
+
+    @pytest.mark.anyio
+    async def test_whitespace_tail_is_not_sent(self):
+        chunker = make_chunker()
+        chunks = [c async for c in chunker.rechunk(stream("   "))]
+        assert chunks == []
+
+    def test_estimate_from_samples(self):
+        """Verifica la estimación de ttfb y tiempo por carácter."""
+        chunker = make_chunker()
+        chunker.record(10, 0.5 + 10 * 0.01)
+        chunker.record(50, 0.5 + 50 * 0.01)
+
+        ttfb, per_char = chunker.estimate()
+
+        assert ttfb == pytest.approx(0.5)
+        assert per_char == pytest.approx(0.01)
+
+    def test_estimate_requires_distinct_sizes(self):
+        chunker = make_chunker()
+        chunker.record(10, 0.3)
+        chunker.record(10, 0.4)
+        assert chunker.estimate() is None
+
+    def test_next_size_adapts_to_latency(self):
+        """Con latencia fija alta, los fragmentos siguientes son más grandes."""
+        slow, fast = (
+            make_chunker(max_chunk_chars=1000),
+            make_chunker(max_chunk_chars=1000),
+        )
+        for chars in (10, 40):
+            slow.record(chars, 1.0 + chars * 0.01)
+            fast.record(chars, 0.05 + chars * 0.01)
+
+        assert slow.next_size(None) == fast.next_size(None) == 10
+        assert slow.next_size(200) == 400
+        assert fast.next_size(200) == 20
+
+    def test_next_size_respects_bounds(self):
+        chunker = make_chunker()
+        chunker.record(10, 0.001 + 10 * 0.01)
+        chunker.record(40, 0.001 + 40 * 0.01)
+
+        assert chunker.next_size(10) == 5
+        assert make_chunker().next_size(60) == 80
+
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            make_chunker(min_chunk_chars=100)
+        with pytest.raises(ValueError):
+            make_chunker(target_overhead=1.5)
+
+    def test_stats(self):
+        stats = make_chunker().stats()
+        assert stats == {"chunk_sizes": [], "ttfb": None, "seconds_per_char": None}
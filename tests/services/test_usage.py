@@ -0,0 +1,94 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.usage import (
+    Metric,
+    RoomUsage,
+    UsageAccounting,
+    build_usage_accounting,
+)
+
+
+def read_records(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestRoomUsage:
+    """Pruebas para los contadores de uso de una sala."""
+
+    def test_add_and_as_dict(self):
+        usage = RoomUsage("sala")
+
+        usage.add(Metric.STT_AUDIO_SECONDS, 1.5)
+        usage.add(Metric.TTS_REQUESTS)
+        usage.add(Metric.TTS_REQUESTS)
+
+        data = usage.as_dict()
+        assert data["stt_audio_seconds"] == 1.5
+        assert data["tts_requests"] == 2
+        assert data["llm_tokens_in"] == 0
+        assert "duration_seconds" in data
+        assert len(usage.counters) == len(Metric)
+
+    def test_record_llm_usage_ignores_non_integers(self):
+        usage = RoomUsage()
+
+        usage.record_llm_usage(SimpleNamespace(prompt_tokens=10, completion_tokens=4))
+        usage.record_llm_usage(SimpleNamespace(prompt_tokens=None, completion_tokens=0))
+        usage.record_llm_usage(object())
+
+        assert usage[Metric.LLM_TOKENS_IN] == 10
+        assert usage[Metric.LLM_TOKENS_OUT] == 4
+
+
+@pytest.mark.anyio
+class TestUsageAccounting:
+    """Pruebas para el registro del uso por sala."""
+
+    async def test_track_writes_room_end(self, tmp_path):
+        """Verifica que cada sala terminada se escriba en el archivo."""
+        path = tmp_path / "usage.jsonl"
+        accounting = UsageAccounting(str(path), flush_interval=0)
+
+        async with accounting.track("sala-1") as usage:
+            usage.add(Metric.TTS_CHARACTERS, 120)
+        async with accounting.track("sala-2") as usage:
+            usage.add(Metric.TTS_CHARACTERS, 30)
+
+        records = read_records(path)
+        assert [r["type"] for r in records] == ["room_end", "room_end"]
+        assert [r["room"] for r in records] == ["sala-1", "sala-2"]
+        assert [r["tts_characters"] for r in records] == [120, 30]
+        assert all("pid" in r for r in records)
+        assert accounting.active == {}
+
+    async def test_periodic_flush(self, tmp_path):
+        """Verifica el volcado periódico mientras hay salas activas."""
+        path = tmp_path / "usage.jsonl"
+        accounting = UsageAccounting(str(path), flush_interval=0.01)
+
+        async with accounting.track("sala") as usage:
+            usage.add(Metric.STT_FINAL_TRANSCRIPTS)
+            await asyncio.sleep(0.05)
+
+        records = read_records(path)
+        assert any(r["type"] == "room" and r["room"] == "sala" for r in records)
+        assert records[-1]["type"] == "room_end"
+        assert records[-1]["stt_final_transcripts"] == 1
+        assert accounting._flush_task is None
+
+    async def test_without_path(self):
+        accounting = UsageAccounting(None, flush_interval=0)
+
+        async with accounting.track("sala") as usage:
+            usage.add(Metric.TTS_REQUESTS)
+
+        assert accounting.room_ended("sala") is None
+
+    async def test_build_usage_accounting_disabled(self, monkeypatch):
+        monkeypatch.setattr("src.services.usage.settings.usage.ENABLED", False)
+
+        assert build_usage_accounting() is None